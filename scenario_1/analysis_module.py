@@ -1,9 +1,18 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+import re
+import hashlib
+from collections import Counter
+from matplotlib import cbook, mlab
+from matplotlib.figure import Figure
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from matplotlib.backends.backend_pdf import PdfPages
+from intermediate_storage_module import read_table, iter_table_chunks
+from rating_sketch_module import RatingSketch, weighted_gaussian_kde
 
 # this module visualizes processed restaurant detail data and saves it to "ratings_analysis.pdf"
+# figures are plain matplotlib Figure objects rendered straight to pdf, so no pyplot/gui backend is used
 
 # get base directory
 BASE_DIR = Path(__file__).resolve().parent
@@ -13,122 +22,297 @@ PREPROCESSED_DATA_DIR = BASE_DIR / "preprocessed_data"
 OUTPUT_DATA_DIR = BASE_DIR / "output/task_3"
 
 
-def analyze_ratings(input_csv_path, pdf_output_path):
+# since there are ratings in other languages, map all ratings to English
+RATING_TEXT_MAPPING = {
+    "Bardzo dobrze": "Very Good",
+    "Bueno": "Good",
+    "Eccellente": "Excellent",
+    "Excelente": "Excellent",
+    "Muito Bom": "Very Good",
+    "Muy Bueno": "Very Good",
+    "Skvělá volba": "Very Good",
+    "Skvělé": "Excellent",
+    "Terbaik": "Excellent",
+    "Velmi dobré": "Very Good"
+}
+
+# define ordered categories for rating_text
+ORDERED_CLASSES = ["Poor", "Average", "Good", "Very Good", "Excellent"]
+
+# columns of the summary statistics table, same as DataFrame.describe()
+SUMMARY_COLUMNS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+def prepare_ratings(df):
     """
-    creates visualizations using processed restaurant details and saves them to "ratings_analysis.pdf"
+    drops unrated restaurants, maps rating_text to ordered English categories
+    and converts aggregate ratings to numbers, dropping missing ones
     """
-    df = pd.read_csv(input_csv_path)
-
-    # list all unique values for rating_text
-    print(f'\n Unique rating_text values: \n {df["rating_text"].unique()}')
+    rating_text = df["rating_text"].astype("category")
 
     # drop "Not rated" values
-    df = df[df["rating_text"] != "Not rated"]
-
-    # since there are ratings in other languages, map all ratings to English
-    rating_text_mapping = {
-        "Bardzo dobrze": "Very Good",
-        "Bueno": "Good",
-        "Eccellente": "Excellent",
-        "Excelente": "Excellent",
-        "Muito Bom": "Very Good",
-        "Muy Bueno": "Very Good",
-        "Skvělá volba": "Very Good",
-        "Skvělé": "Excellent",
-        "Terbaik": "Excellent",
-        "Velmi dobré": "Very Good"
-    }
-    df["rating_text"] = df["rating_text"].replace(rating_text_mapping)
-
-    # define ordered categories for rating_text
-    ordered_classes = ["Poor", "Average", "Good", "Very Good", "Excellent"]
-    df["rating_text"] = pd.Categorical(
-        df["rating_text"], categories=ordered_classes, ordered=True)
+    rated = (rating_text != "Not rated").to_numpy()
+    df = df[rated].copy()
+    rating_text = rating_text[rated]
+
+    # translate the category dictionary once instead of every row, texts outside
+    # ORDERED_CLASSES after translation become missing values
+    translated = rating_text.cat.categories.map(lambda text: RATING_TEXT_MAPPING.get(text, text))
+    class_codes = pd.Index(ORDERED_CLASSES).get_indexer(translated)
+    codes = rating_text.cat.codes.to_numpy()
+    df["rating_text"] = pd.Categorical.from_codes(
+        np.where(codes >= 0, class_codes[codes], -1), categories=ORDERED_CLASSES, ordered=True)
 
     # convert 'user_aggregate_rating' to numeric
     df["user_aggregate_rating"] = pd.to_numeric(
         df["user_aggregate_rating"], errors="coerce")
 
     # drop missing values for aggregate ratings
-    df = df.dropna(subset=["user_aggregate_rating"])
+    return df.dropna(subset=["user_aggregate_rating"])
+
+
+def _gaussian_kde(values, coords, max_unique_values=10000):
+    """
+    gaussian kernel density estimate used for the violin plots, same as Axes.violinplot (scott's bandwidth)
+    values are sorted, ratings only take a few distinct values so the kernel is summed once per
+    distinct value weighted by its count instead of once per rating
+    """
+    # a single distinct value has no spread to estimate a density from
+    if np.all(values[0] == values):
+        return (values[0] == coords).astype(float)
+
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    if len(starts) > max_unique_values:
+        return mlab.GaussianKDE(values, None).evaluate(coords)
+
+    value_counts = np.diff(np.r_[starts, len(values)])
+    return weighted_gaussian_kde(values[starts], value_counts, values.var(ddof=1), coords)
+
+
+def _summary_frame(summary_rows):
+    """
+    builds the summary statistics table indexed by the ordered rating classes
+    """
+    return pd.DataFrame(summary_rows, columns=SUMMARY_COLUMNS, index=pd.CategoricalIndex(
+        ORDERED_CLASSES, categories=ORDERED_CLASSES, ordered=True, name="rating_text"))
+
+
+def compute_rating_statistics(df, histogram_bins=20, violin_points=100):
+    """
+    computes everything the ratings report needs in a single grouped aggregation
+    ratings are sorted once by (rating_text, rating) so each category is a contiguous sorted slice, from which
+    counts, moments, quantiles, box plot and violin statistics are read without re-filtering the data
+    """
+    ratings = df["user_aggregate_rating"].to_numpy(dtype=float)
+    codes = df["rating_text"].cat.codes.to_numpy()
+
+    # ratings whose rating_text is not one of the ordered classes only feature in the histogram
+    in_class = codes >= 0
+    order = np.lexsort((ratings[in_class], codes[in_class]))
+    sorted_ratings = ratings[in_class][order]
+    counts = np.bincount(codes[in_class], minlength=len(ORDERED_CLASSES))
+    values = np.split(sorted_ratings, np.cumsum(counts)[:-1])
+
+    summary_rows = []
+    for category_values in values:
+        if len(category_values) == 0:
+            summary_rows.append([0.0] + [np.nan] * (len(SUMMARY_COLUMNS) - 1))
+            continue
+        q1, median, q3 = np.percentile(category_values, [25, 50, 75])
+        std = category_values.std(ddof=1) if len(
+            category_values) > 1 else np.nan
+        summary_rows.append([float(len(category_values)), category_values.mean(), std,
+                             category_values[0], q1, median, q3, category_values[-1]])
+
+    summary = _summary_frame(summary_rows)
+
+    # violins can only be drawn for categories with ratings
+    violin_positions = [i + 1 for i, category_values in enumerate(values)
+                        if len(category_values) > 0]
+    violin_stats = cbook.violin_stats(
+        [category_values for category_values in values if len(
+            category_values) > 0],
+        _gaussian_kde, points=violin_points) if violin_positions else []
+
+    return {
+        "summary": summary,
+        "counts": pd.Series(counts, index=ORDERED_CLASSES, name="count"),
+        "histogram": np.histogram(ratings, bins=histogram_bins),
+        "box_stats": cbook.boxplot_stats(values, labels=ORDERED_CLASSES),
+        "violin_stats": violin_stats,
+        "violin_positions": violin_positions
+    }
+
+
+def update_rating_sketches(sketches, df):
+    """
+    adds a chunk of prepared ratings to the sketches (one per rating class plus "all" ratings)
+    """
+    sketches["all"].update(df["user_aggregate_rating"].to_numpy(dtype=float))
+    for rating_class, class_df in df.groupby("rating_text", observed=True):
+        sketches[rating_class].update(
+            class_df["user_aggregate_rating"].to_numpy(dtype=float))
+    return sketches
+
+
+def sketch_ratings(input_path, chunk_size=1_000_000):
+    """
+    builds rating sketches from a preprocessed restaurant table, reading it chunk by chunk
+    memory is bounded by the chunk size however large the table is
+    """
+    sketches = {key: RatingSketch() for key in ["all"] + ORDERED_CLASSES}
+    for chunk in iter_table_chunks(input_path, columns=["rating_text", "user_aggregate_rating"],
+                                   chunk_size=chunk_size):
+        update_rating_sketches(sketches, prepare_ratings(chunk))
+    return sketches
+
+
+def merge_rating_sketches(sketches_list):
+    """
+    merges rating sketches built from different shards into one set of sketches
+    """
+    merged = {key: RatingSketch() for key in ["all"] + ORDERED_CLASSES}
+    for sketches in sketches_list:
+        for key, sketch in sketches.items():
+            merged[key].merge(sketch)
+    return merged
+
+
+def sketch_rating_statistics(sketches, histogram_bins=20, violin_points=100):
+    """
+    computes the same report statistics as compute_rating_statistics from rating sketches
+    """
+    class_sketches = [sketches[rating_class] for rating_class in ORDERED_CLASSES]
+    violin_positions = [i + 1 for i, sketch in enumerate(class_sketches)
+                        if sketch.count > 0]
+
+    return {
+        "summary": _summary_frame([sketch.describe() for sketch in class_sketches]),
+        "counts": pd.Series([sketch.count for sketch in class_sketches], index=ORDERED_CLASSES, name="count"),
+        "histogram": sketches["all"].histogram(bins=histogram_bins),
+        "box_stats": [sketch.box_stats(rating_class) if sketch.count > 0 else cbook.boxplot_stats([[]])[0]
+                      for rating_class, sketch in zip(ORDERED_CLASSES, class_sketches)],
+        "violin_stats": [sketch.violin_stats(points=violin_points)
+                         for sketch in class_sketches if sketch.count > 0],
+        "violin_positions": violin_positions
+    }
 
-    # groupby rating_text and describe to get idea of data
-    rating_summary = df.groupby("rating_text", observed=False)[
-        "user_aggregate_rating"].describe()
-    print(f"\nPreliminary Rating Summary:\n {rating_summary}")
 
-    # create figure for summary table
-    fig_summary, ax_summary = plt.subplots(figsize=(10, 4))
+def analyze_ratings_approximate(input_paths, pdf_output_path, chunk_size=1_000_000, max_workers=None):
+    """
+    creates the ratings report from bounded-memory rating sketches instead of all ratings
+    each input table (shard) is sketched chunk by chunk in a worker process and the sketches are merged
+    """
+    input_paths = list(input_paths)
+    if len(input_paths) == 1:
+        sketches_list = [sketch_ratings(input_paths[0], chunk_size)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            sketches_list = list(executor.map(
+                sketch_ratings, input_paths, [chunk_size] * len(input_paths)))
+
+    stats = sketch_rating_statistics(merge_rating_sketches(sketches_list))
+    print(f"\nApproximate Rating Summary:\n {stats['summary']}")
+
+    render_ratings_report(stats, pdf_output_path)
+    print(f"\nRating analysis saved at: {pdf_output_path}")
+
+
+def render_summary_table(stats):
+    """
+    1: table of summary statistics of aggregate rating by rating text
+    """
+    rating_summary = stats["summary"]
+    fig_summary = Figure(figsize=(10, 4))
+    ax_summary = fig_summary.subplots()
     ax_summary.axis("tight")
     ax_summary.axis("off")
     ax_summary.set_title(
         "1: Summary Statistics of Aggregate Rating by Rating Text")
-    table = ax_summary.table(cellText=rating_summary.round(2).values,
-                             colLabels=rating_summary.columns,
-                             rowLabels=rating_summary.index,
-                             cellLoc="center",
-                             loc="center")
-
-    # 1: histogram of aggregate ratings
-    fig1, ax1 = plt.subplots(figsize=(8, 5))
-    ax1.hist(df["user_aggregate_rating"], bins=20,
+    ax_summary.table(cellText=rating_summary.round(2).values,
+                     colLabels=rating_summary.columns,
+                     rowLabels=rating_summary.index,
+                     cellLoc="center",
+                     loc="center")
+    return fig_summary
+
+
+def render_histogram(stats):
+    """
+    2: histogram of aggregate ratings
+    """
+    bin_counts, bin_edges = stats["histogram"]
+    fig1 = Figure(figsize=(8, 5))
+    ax1 = fig1.subplots()
+    ax1.hist(bin_edges[:-1], bins=bin_edges, weights=bin_counts,
              color="blue", alpha=0.7, edgecolor="black")
     ax1.set_title("2: Distribution of Aggregate Ratings")
     ax1.set_xlabel("Aggregate Rating", fontweight="bold")
     ax1.set_ylabel("Count", fontweight="bold")
+    return fig1
+
 
-    # 2: bar plot for counts of rating_text
-    fig2, ax2 = plt.subplots(figsize=(8, 5))
-    rating_counts = df["rating_text"].value_counts()
-    rating_counts = rating_counts.reindex(
-        ordered_classes, fill_value=0)
+def render_rating_counts(stats):
+    """
+    3: bar plot for counts of rating_text
+    """
+    rating_counts = stats["counts"]
+    fig2 = Figure(figsize=(8, 5))
+    ax2 = fig2.subplots()
     ax2.bar(rating_counts.index, rating_counts.values, color="blue", alpha=0.7)
     ax2.set_title("3: Count of Each Rating Text")
     ax2.set_xlabel("Rating Text", fontweight="bold")
     ax2.set_ylabel("Count", fontweight="bold")
-    ax2.set_xticks(range(len(ordered_classes)))
-    ax2.set_xticklabels(ordered_classes, rotation=0)
+    ax2.set_xticks(range(len(ORDERED_CLASSES)))
+    ax2.set_xticklabels(ORDERED_CLASSES, rotation=0)
+    return fig2
+
 
-    # 3: bar plot for mean aggregate rating by rating_text
-    fig3, ax3 = plt.subplots(figsize=(8, 5))
-    mean_ratings = df.groupby("rating_text", observed=False)[
-        "user_aggregate_rating"].mean()
-    mean_ratings = mean_ratings.reindex(ordered_classes, fill_value=0)
+def render_mean_ratings(stats):
+    """
+    4: scatter plot for mean aggregate rating by rating_text
+    """
+    mean_ratings = stats["summary"]["mean"].fillna(0)
+    fig3 = Figure(figsize=(8, 5))
+    ax3 = fig3.subplots()
 
-    ax3.scatter(mean_ratings.index, mean_ratings.values,
+    ax3.scatter(ORDERED_CLASSES, mean_ratings.values,
                 color="red", alpha=0.7)
 
     ax3.set_title("4: Mean Aggregate Rating by Rating Text")
     ax3.set_xlabel("Rating Text", fontweight="bold")
     ax3.set_ylabel("Mean Aggregate Rating", fontweight="bold")
-    ax3.set_xticks(range(len(ordered_classes)))
-    ax3.set_xticklabels(ordered_classes, rotation=0)
+    ax3.set_xticks(range(len(ORDERED_CLASSES)))
+    ax3.set_xticklabels(ORDERED_CLASSES, rotation=0)
     ax3.set_ylim(2.0, 5.0)
 
     # Add exact value labels for each data point
     for i, value in enumerate(mean_ratings.values):
         ax3.text(i, value + 0.05, f"{value:.2f}",
                  ha="center", fontsize=10, fontweight="bold")
+    return fig3
+
 
-    # 4: box plots of aggregate ratings by rating_text with mean and whisker labels
-    fig4, ax4 = plt.subplots(figsize=(8, 5))
-    boxplot = df.boxplot(column="user_aggregate_rating", by="rating_text",
-                         ax=ax4, grid=False, patch_artist=True)
+def render_box_plot(stats):
+    """
+    5: box plots of aggregate ratings by rating_text with mean and whisker labels
+    """
+    fig4 = Figure(figsize=(8, 5))
+    ax4 = fig4.subplots()
+    ax4.bxp(stats["box_stats"], patch_artist=True)
 
     ax4.set_title("5: Box Plot of Aggregate Ratings by Rating Text")
     ax4.set_xlabel("Rating Text", fontweight="bold")
     ax4.set_ylabel("Aggregate Rating", fontweight="bold")
-    ax4.set_xticks(range(1, len(ordered_classes) + 1))
-    ax4.set_xticklabels(ordered_classes, rotation=0)
+    ax4.set_xticks(range(1, len(ORDERED_CLASSES) + 1))
+    ax4.set_xticklabels(ORDERED_CLASSES, rotation=0)
     ax4.set_ylim(2.0, 5.0)
-    plt.suptitle("")
 
     # get data for whiskers and mean value labels
-    box_data = df.groupby("rating_text", observed=False)[
-        "user_aggregate_rating"].describe()
+    box_data = stats["summary"]
 
-    for i, cat in enumerate(ordered_classes):
-        if cat in box_data.index:
+    for i, cat in enumerate(ORDERED_CLASSES):
+        if box_data.loc[cat, "count"] > 0:
             mean_value = box_data.loc[cat, "mean"]
             min_value = box_data.loc[cat, "min"]
             max_value = box_data.loc[cat, "max"]
@@ -142,40 +326,122 @@ def analyze_ratings(input_csv_path, pdf_output_path):
                      ha="center", fontsize=7, fontweight="bold", color="red")
             ax4.text(i + 1, max_value + 0.15, f"Max: {max_value:.2f}",
                      ha="center", fontsize=7, fontweight="bold", color="red")
+    return fig4
 
-    # 5: violin plots of aggregate ratings by rating_text
-    fig5, ax5 = plt.subplots(figsize=(8, 5))
-    df_sorted = df.sort_values("rating_text")
-    violin_data = [df_sorted[df_sorted["rating_text"] == cat]
-                   ["user_aggregate_rating"].dropna() for cat in ordered_classes]
-
-    parts = ax5.violinplot(violin_data, showmedians=True)
 
-    ax5.set_xticks(range(1, len(ordered_classes) + 1))
-    ax5.set_xticklabels(ordered_classes, rotation=0)
+def render_violin_plot(stats):
+    """
+    6: violin plots of aggregate ratings by rating_text
+    """
+    fig5 = Figure(figsize=(8, 5))
+    ax5 = fig5.subplots()
+    if stats["violin_stats"]:
+        ax5.violin(stats["violin_stats"],
+                   positions=stats["violin_positions"], showmedians=True)
+
+    ax5.set_xticks(range(1, len(ORDERED_CLASSES) + 1))
+    ax5.set_xticklabels(ORDERED_CLASSES, rotation=0)
     ax5.set_title("6: Violin Plot of Ratings Per Rating Text")
     ax5.set_xlabel("Rating Text", fontweight="bold")
     ax5.set_ylabel("Aggregate Rating", fontweight="bold")
     ax5.set_ylim(2.0, 5.0)
+    return fig5
 
-    # save figures onto a pdf
-    with PdfPages(pdf_output_path) as pdf:
-        pdf.savefig(fig_summary)
-        pdf.savefig(fig1)
-        pdf.savefig(fig2)
-        pdf.savefig(fig3)
-        pdf.savefig(fig4)
-        pdf.savefig(fig5)
+
+# figures of the ratings report in page order
+FIGURE_RENDERERS = [
+    render_summary_table, render_histogram, render_rating_counts,
+    render_mean_ratings, render_box_plot, render_violin_plot
+]
+
+
+def analyze_ratings(input_path, pdf_output_path, approximate=False, chunk_size=1_000_000):
+    """
+    creates visualizations using processed restaurant details and saves them to "ratings_analysis.pdf"
+    approximate=True builds the report from rating sketches, reading the input chunk_size rows at a time
+    """
+    if approximate:
+        analyze_ratings_approximate([input_path], pdf_output_path, chunk_size)
+        return
+
+    # only the rating columns are needed for the analysis
+    df = read_table(input_path, columns=[
+                    "rating_text", "user_aggregate_rating"])
+
+    # list all unique values for rating_text
+    print(f'\n Unique rating_text values: \n {df["rating_text"].unique()}')
+
+    df = prepare_ratings(df)
+
+    # every figure and table is rendered from one aggregation of the ratings
+    stats = compute_rating_statistics(df)
+    print(f"\nPreliminary Rating Summary:\n {stats['summary']}")
+
+    render_ratings_report(stats, pdf_output_path)
 
     print(f"\nRating analysis saved at: {pdf_output_path}")
 
 
+def render_ratings_report(stats, pdf_output_path):
+    """
+    renders the report figures one at a time onto a pdf, releasing each figure once it is written
+    only needs the small output of compute_rating_statistics, so it can run in a worker process
+    """
+    with PdfPages(pdf_output_path) as pdf:
+        for render in FIGURE_RENDERERS:
+            fig = render(stats)
+            pdf.savefig(fig)
+            # figures are not tracked by pyplot, clearing drops their artists right away
+            fig.clear()
+    return pdf_output_path
+
+
+def partition_file_names(partition_values):
+    """
+    returns a portable file name part for each partition value, non word characters are replaced by "_"
+    values whose replaced names collide (e.g. "New Zealand" and "New_Zealand") get a short hash of the
+    value appended, except a value that is already portable as it is
+    """
+    safe_values = [re.sub(r"[^\w.-]+", "_", str(value)) for value in partition_values]
+    counts = Counter(safe_values)
+    return [safe_value if counts[safe_value] == 1 or safe_value == str(value)
+            else f"{safe_value}-{hashlib.sha1(str(value).encode()).hexdigest()[:8]}"
+            for value, safe_value in zip(partition_values, safe_values)]
+
+
+def analyze_ratings_by_partition(input_path, output_dir, partition_column="country", max_workers=None):
+    """
+    creates one ratings report per value of partition_column (e.g. per country or city) in a single invocation
+    statistics are aggregated here and the pdfs are rendered in parallel worker processes
+    returns a dictionary of partition value to pdf path
+    """
+    df = read_table(input_path, columns=[
+                    partition_column, "rating_text", "user_aggregate_rating"])
+    df = prepare_ratings(df)
+
+    partition_values = []
+    report_stats = []
+    for partition_value, partition_df in df.groupby(partition_column, observed=True, sort=True):
+        partition_values.append(partition_value)
+        report_stats.append(compute_rating_statistics(partition_df))
+    # keep file names portable and distinct whatever the partition values contain
+    report_paths = [Path(output_dir) / f"ratings_analysis_{partition_column}={file_name}.pdf"
+                    for file_name in partition_file_names(partition_values)]
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(render_ratings_report, report_stats, report_paths))
+
+    print(f"\n{len(report_paths)} rating analysis report(s) saved in: {output_dir}")
+    return dict(zip(partition_values, report_paths))
+
+
 def main():
     """Runs analysis module standalone (for testing)."""
-    input_csv_path = PREPROCESSED_DATA_DIR / "preprocessed_restaurant_details.csv"
+    input_path = PREPROCESSED_DATA_DIR / "preprocessed_restaurant_details.parquet"
     pdf_output_path = OUTPUT_DATA_DIR / "ratings_analysis.pdf"
 
-    analyze_ratings(input_csv_path, pdf_output_path)
+    analyze_ratings(input_path, pdf_output_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+import time
+import tracemalloc
+import pandas as pd
+from preprocessing_module import (
+    ColumnarBuilder, RESTAURANT_SCHEMA, RESTAURANT_COLUMNS, extract_restaurant_and_event_rows)
+
+# this module compares the columnar builder used by the preprocessing extractors
+# with the previous list-of-dicts path, reporting time and peak traced memory
+# run from the scenario_1 directory with: python -m benchmarks.bench_columnar_builder
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000]
+
+
+def make_pages(restaurant_count, page_size=20):
+    """
+    builds in-memory raw json pages with restaurant_count restaurants
+    """
+    pages = []
+    for start in range(0, restaurant_count, page_size):
+        restaurants = []
+        for res_id in range(start, min(start + page_size, restaurant_count)):
+            restaurants.append({"restaurant": {
+                "R": {"res_id": res_id},
+                "name": f"Restaurant {res_id}",
+                "location": {"city": f"City {res_id % 50}", "country_id": res_id % 15},
+                "user_rating": {"votes": str(res_id % 5000), "aggregate_rating": f"{res_id % 50 / 10:.1f}",
+                                "rating_text": "Very Good"},
+                "cuisines": "North Indian, Chinese",
+                "zomato_events": []
+            }})
+        pages.append({"restaurants": restaurants})
+    return pages
+
+
+def list_of_dicts_path(pages):
+    """
+    previous approach, one dict per row then pandas infers the schema
+    """
+    extracted_data = []
+    extract_restaurant_and_event_rows(
+        pages, restaurant_sink=lambda row: extracted_data.append(dict(zip(RESTAURANT_COLUMNS, row))))
+    return pd.DataFrame(extracted_data)
+
+
+def columnar_builder_path(pages):
+    """
+    current approach, row tuples transposed into typed column arrays
+    """
+    builder = ColumnarBuilder(RESTAURANT_SCHEMA)
+    extract_restaurant_and_event_rows(pages, restaurant_sink=builder.append)
+    return builder.to_dataframe()
+
+
+def measure(func, pages):
+    """
+    returns wall time in seconds and peak traced memory in MB of func(pages)
+    time and memory are measured in separate runs since tracing slows execution down
+    """
+    start = time.perf_counter()
+    func(pages)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 ** 2
+
+
+def main():
+    """
+    runs the benchmark for each row count and prints a comparison
+    """
+    print(f"{'rows':>10} {'path':>16} {'time (s)':>10} {'peak (MB)':>10}")
+    for row_count in ROW_COUNTS:
+        pages = make_pages(row_count)
+        for name, func in [("list_of_dicts", list_of_dicts_path), ("columnar", columnar_builder_path)]:
+            elapsed, peak = measure(func, pages)
+            print(f"{row_count:>10} {name:>16} {elapsed:>10.3f} {peak:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import io
+import csv
+import json
+import argparse
+import shutil
+import platform
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from preprocessing_module import json_files_to_restaurant_and_event_csv
+from extraction_module_1 import filter_restaurant_details
+from extraction_module_2 import filter_events_by_date
+from analysis_module import analyze_ratings
+from instrumentation_module import PipelineMetrics
+from benchmarks.synthetic_data import write_restaurants_json_shards
+
+# this module times every scenario_1 pipeline stage on synthetic restaurants.json data of growing size
+# results are appended to benchmarks/results so runs on different commits can be compared,
+# a run compared against a baseline results file fails if a stage got slower than the threshold
+# run from the scenario_1 directory with: python -m benchmarks.bench_pipeline --sizes 1000 100000 10000000
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+RESULTS_CSV_NAME = "bench_pipeline_results.csv"
+COUNTRY_EXCEL_PATH = BASE_DIR / "raw_data" / "Country-Code.xlsx"
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+STAGES = ["preprocess", "restaurant_details", "restaurant_events", "ratings_analysis"]
+RESULT_FIELDS = ["run_id", "git_commit", "python", "size", "stage", "wall_time_s", "cpu_time_s",
+                 "child_cpu_time_s", "peak_rss_mb", "rows_in", "rows_out", "us_per_restaurant"]
+# a stage regresses when it takes this many times its baseline wall time
+REGRESSION_THRESHOLD = 1.25
+# stages faster than this are too noisy to compare
+MIN_COMPARED_WALL_TIME_S = 0.1
+
+
+def git_commit():
+    """
+    returns the short hash of the checked out commit, or None outside a git repository
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_stages(json_paths, work_dir, approximate=False):
+    """
+    returns (name, action, inputs, outputs) of the pipeline stages run on the synthetic data in work_dir
+    """
+    restaurant_path = work_dir / "preprocessed_restaurant_details.parquet"
+    event_path = work_dir / "preprocessed_event_data.parquet"
+    restaurant_details_path = work_dir / "restaurant_details.csv"
+    event_details_path = work_dir / "restaurant_events.csv"
+
+    return [
+        ("preprocess", lambda: json_files_to_restaurant_and_event_csv(json_paths, restaurant_path, event_path),
+         json_paths, [restaurant_path, event_path]),
+        ("restaurant_details", lambda: filter_restaurant_details(
+            restaurant_path, COUNTRY_EXCEL_PATH, restaurant_details_path),
+         [restaurant_path], [restaurant_details_path]),
+        ("restaurant_events", lambda: filter_events_by_date(
+            event_path, event_details_path, "2019-04-01", "2019-04-30"),
+         [event_path], [event_details_path]),
+        ("ratings_analysis", lambda: analyze_ratings(
+            restaurant_path, work_dir / "ratings_analysis.pdf", approximate=approximate),
+         [restaurant_path], []),
+    ]
+
+
+def benchmark_size(size, work_dir, shard_count=1, approximate=False, repeat=3, seed=0):
+    """
+    generates size synthetic restaurants in work_dir and runs the stages repeat times
+    returns one result row per stage with the metrics of its fastest run
+    """
+    work_dir = Path(work_dir)
+    json_paths = write_restaurants_json_shards(work_dir / "raw_data", size, shard_count, seed)
+
+    fastest = {}
+    for _ in range(repeat):
+        metrics = PipelineMetrics(work_dir / "metrics")
+        for name, action, inputs, outputs in build_stages(json_paths, work_dir, approximate):
+            # stage messages would drown the benchmark report
+            with redirect_stdout(io.StringIO()):
+                metrics.measure(name, action, inputs, outputs)()
+            if name not in fastest or metrics.steps[name]["wall_time_s"] < fastest[name]["wall_time_s"]:
+                fastest[name] = metrics.steps[name]
+
+    return [{"size": size, "stage": name,
+             **{field: fastest[name][field] for field in RESULT_FIELDS if field in fastest[name]},
+             "us_per_restaurant": round(fastest[name]["wall_time_s"] / size * 1e6, 3)}
+            for name in STAGES]
+
+
+def write_results(rows, results_dir):
+    """
+    appends result rows to the results csv and writes them as this run's json file, returns the json path
+    """
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    csv_path = results_dir / RESULTS_CSV_NAME
+    write_header = not csv_path.exists()
+    with open(csv_path, "a", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+    json_path = results_dir / f"bench_pipeline_{rows[0]['run_id']}.json"
+    with open(json_path, "w", encoding="utf-8") as file:
+        json.dump(rows, file, indent=2)
+    return json_path
+
+
+def compare_results(rows, baseline_rows, threshold=REGRESSION_THRESHOLD):
+    """
+    compares wall times with a baseline run of the same sizes and stages
+    returns (size, stage, baseline time, time, ratio) of every stage slower than threshold times its baseline
+    """
+    baseline = {(row["size"], row["stage"]): row["wall_time_s"] for row in baseline_rows}
+    regressions = []
+    for row in rows:
+        baseline_time = baseline.get((row["size"], row["stage"]))
+        if baseline_time is None or baseline_time < MIN_COMPARED_WALL_TIME_S:
+            continue
+        ratio = row["wall_time_s"] / baseline_time
+        if ratio > threshold:
+            regressions.append((row["size"], row["stage"], baseline_time, row["wall_time_s"], ratio))
+    return regressions
+
+
+def main():
+    """
+    runs the benchmark for each size, prints a report and saves the results
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the scenario 1 pipeline on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help=f"numbers of restaurants to benchmark (e.g. {' '.join(map(str, SIZES))})")
+    parser.add_argument("--shards", type=int, default=1, help="number of raw json files per size")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per size, the fastest run of each stage is reported")
+    parser.add_argument("--approximate", action="store_true", help="use sketch based rating statistics")
+    parser.add_argument("--work-dir", help="directory for the generated data (default: a temporary directory)")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--baseline", help="results json of an earlier run to compare against")
+    args = parser.parse_args()
+
+    run_info = {"run_id": datetime.now().strftime("%Y%m%dT%H%M%S"), "git_commit": git_commit(),
+                "python": platform.python_version()}
+    rows = []
+
+    print(f"{'size':>10} {'stage':>20} {'time (s)':>10} {'cpu (s)':>10} {'us/rest.':>10} {'rss (MB)':>10}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in args.sizes:
+            work_dir = Path(args.work_dir or temp_dir) / f"size_{size}"
+            for row in benchmark_size(size, work_dir, args.shards, args.approximate, args.repeat):
+                row.update(run_info)
+                rows.append(row)
+                print(f"{size:>10} {row['stage']:>20} {row['wall_time_s']:>10.3f} {row['cpu_time_s']:>10.3f} "
+                      f"{row['us_per_restaurant']:>10.2f} {row['peak_rss_mb'] or 0:>10.1f}")
+            if not args.work_dir:
+                # generated data of large sizes takes gigabytes
+                shutil.rmtree(work_dir)
+
+    print(f"\nBenchmark results saved at: {write_results(rows, args.results_dir)}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare_results(rows, json.load(file))
+        for size, stage, baseline_time, wall_time, ratio in regressions:
+            print(f"Regression: {stage} at {size} restaurants took {wall_time:.3f}s "
+                  f"vs {baseline_time:.3f}s ({ratio:.2f}x)")
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
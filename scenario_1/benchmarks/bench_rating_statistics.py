@@ -0,0 +1,67 @@
+import time
+import numpy as np
+import pandas as pd
+from matplotlib import cbook, mlab
+from analysis_module import ORDERED_CLASSES, compute_rating_statistics
+
+# this module compares the single aggregation pass of analyze_ratings with the previous per-figure
+# aggregations (two describe() calls, a groupby mean, value_counts and one boolean filter per category)
+# run from the scenario_1 directory with: python -m benchmarks.bench_rating_statistics
+
+ROW_COUNTS = [100_000, 1_000_000, 10_000_000]
+
+
+def make_ratings(row_count, seed=0):
+    """
+    builds a prepared ratings frame with row_count random ratings in the ordered classes
+    """
+    rng = np.random.default_rng(seed)
+    ratings = np.round(rng.uniform(2.0, 4.9, row_count), 1)
+    # ratings map to their rating text like the real data
+    class_codes = np.digitize(ratings, [2.5, 3.5, 4.0, 4.5])
+    return pd.DataFrame({
+        "rating_text": pd.Categorical.from_codes(class_codes, categories=ORDERED_CLASSES, ordered=True),
+        "user_aggregate_rating": ratings
+    })
+
+
+def previous_aggregations(df):
+    """
+    aggregations previously computed while building each figure, including the statistics
+    matplotlib derived internally for the histogram, box plot and violin plot
+    """
+    grouped = df.groupby("rating_text", observed=False)["user_aggregate_rating"]
+    grouped.describe()
+    np.histogram(df["user_aggregate_rating"], bins=20)
+    df["rating_text"].value_counts().reindex(ORDERED_CLASSES, fill_value=0)
+    grouped.mean().reindex(ORDERED_CLASSES, fill_value=0)
+    cbook.boxplot_stats([group.to_numpy() for _, group in grouped])
+    grouped.describe()
+    df_sorted = df.sort_values("rating_text")
+    violin_data = [df_sorted[df_sorted["rating_text"] == cat]["user_aggregate_rating"].dropna()
+                   for cat in ORDERED_CLASSES]
+    cbook.violin_stats([values.to_numpy() for values in violin_data],
+                       lambda values, coords: mlab.GaussianKDE(values, None).evaluate(coords))
+
+
+def main():
+    """
+    times both approaches for each row count and prints a comparison
+    """
+    print(f"{'rows':>10} {'previous (s)':>13} {'single pass (s)':>16}")
+    for row_count in ROW_COUNTS:
+        df = make_ratings(row_count)
+
+        start = time.perf_counter()
+        previous_aggregations(df)
+        previous_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compute_rating_statistics(df)
+        single_pass_elapsed = time.perf_counter() - start
+
+        print(f"{row_count:>10} {previous_elapsed:>13.2f} {single_pass_elapsed:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# this module times the cold start of both scenario entry points in fresh interpreters
+# and checks which heavy dependencies they import before doing any work,
+# it fails if an entry point is slower than its budget or imports a heavy dependency up front
+# run from the scenario_1 directory with: python -m benchmarks.bench_startup
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SCENARIO_2_DIR = BASE_DIR.parent / "scenario_2"
+
+# dependencies that should only be imported by the steps or searches that use them
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "matplotlib", "openpyxl", "rapidfuzz", "requests"]
+
+# (name, working directory, arguments of main.py, stdin, budget in seconds)
+# the pipeline prints its usage, the carpark CLI shows its menu and exits
+ENTRY_POINTS = [
+    ("scenario_1 main.py --help", BASE_DIR, ["--help"], "", 0.3),
+    ("scenario_2 main.py menu", SCENARIO_2_DIR, [], "3\n", 0.3),
+]
+
+# runs main.py as a script in the child interpreter, then reports the heavy modules it imported
+RUN_ENTRY_POINT = """
+import sys, runpy
+sys.argv = ["main.py"] + sys.argv[1:]
+try:
+    runpy.run_path("main.py", run_name="__main__")
+except SystemExit:
+    pass
+print(",".join(m for m in {heavy_modules!r} if m in sys.modules), file=sys.stderr)
+"""
+
+
+def run_entry_point(cwd, args, stdin):
+    """
+    runs main.py of a scenario in a fresh interpreter, returns its wall time and the heavy modules it imported
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", RUN_ENTRY_POINT.format(heavy_modules=HEAVY_MODULES), *args],
+        cwd=cwd, input=stdin, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+
+    imported = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ""
+    return elapsed, [module for module in imported.split(",") if module]
+
+
+def interpreter_startup_time(repeat):
+    """
+    returns the median time of starting an interpreter that does nothing, the floor of any entry point
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    """
+    times each entry point, prints a report and exits with an error if a budget is exceeded
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks the cold start of the scenario entry points.")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per entry point, the median is reported")
+    args = parser.parse_args()
+
+    print(f"interpreter startup: {interpreter_startup_time(args.repeat):.3f}s\n")
+    print(f"{'entry point':>28} {'median (s)':>10} {'budget (s)':>10}  heavy imports")
+
+    failures = []
+    for name, cwd, entry_args, stdin, budget in ENTRY_POINTS:
+        runs = [run_entry_point(cwd, entry_args, stdin) for _ in range(args.repeat)]
+        median = statistics.median(elapsed for elapsed, _ in runs)
+        imported = runs[-1][1]
+        print(f"{name:>28} {median:>10.3f} {budget:>10.3f}  {', '.join(imported) or '-'}")
+
+        if median > budget:
+            failures.append(f"{name} took {median:.3f}s, over its {budget:.3f}s budget")
+        if imported:
+            failures.append(f"{name} imported {', '.join(imported)} at startup")
+
+    for failure in failures:
+        print(f"Startup regression: {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("\nAll entry points started within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import json
+import random
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+# this module generates synthetic zomato restaurants.json files in the raw data schema
+# (pages of "restaurants" with nested "R", "location", "user_rating" and "zomato_events"),
+# the country ids, rating texts and event share follow the real raw data
+# run from the scenario_1 directory with: python -m benchmarks.synthetic_data 100000 raw_data/restaurants_synthetic.json
+
+# country ids of the real data with their restaurant counts as weights, like in the real data
+# id 17 has no mapping in Country-Code.xlsx so its restaurants are filtered out in task 1
+COUNTRY_WEIGHTS = {1: 780, 215: 100, 189: 80, 214: 60, 30: 60, 148: 60, 208: 40, 184: 20,
+                   191: 20, 166: 20, 162: 20, 17: 20, 94: 20}
+CITIES = ["New Delhi", "Gurgaon", "Noida", "Mumbai", "Bangalore", "Jakarta", "Manila", "London",
+          "Singapore", "Doha", "Sao Paulo", "Ankara", "Auckland", "Colombo", "Cape Town"]
+CUISINES = ["North Indian", "Chinese", "Continental", "Italian", "Cafe", "Fast Food", "Asian",
+            "Desserts", "Bakery", "Japanese", "Mexican", "Seafood", "Thai", "Pizza", "Burger"]
+# aggregate rating ranges of each rating text, including non english texts of the real data
+RATING_TEXT_RANGES = [("Poor", 1.8, 2.4), ("Average", 2.5, 3.4), ("Good", 3.5, 3.9),
+                      ("Very Good", 4.0, 4.4), ("Excellent", 4.5, 4.9), ("Muy Bueno", 4.0, 4.4),
+                      ("Velmi dobré", 4.0, 4.4), ("Excelente", 4.5, 4.9), ("Terbaik", 4.5, 4.9),
+                      ("Bueno", 3.5, 3.9), ("Not rated", 0.0, 0.0)]
+RATING_TEXT_WEIGHTS = [1, 60, 143, 623, 435, 2, 3, 2, 2, 1, 23]
+EVENT_TITLES = ["Live Music Night", "Happy Hours", "Weekend Brunch", "Karaoke Fridays",
+                "Stand Up Comedy", "Ladies Night", "BackToBasic Wednesdays !!"]
+EVENT_DATES_START = date(2018, 10, 1)
+EVENT_DATES_DAYS = 365
+
+
+def generate_event(rng, event_id):
+    """
+    builds one synthetic zomato event listing
+    """
+    start_date = EVENT_DATES_START + timedelta(days=rng.randrange(EVENT_DATES_DAYS))
+    end_date = start_date + timedelta(days=rng.randrange(0, 120))
+    return {"event": {
+        "event_id": event_id,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "start_time": "20:00:00",
+        "end_time": "23:59:59",
+        "is_active": 1,
+        "photos": [{"photo": {
+            "url": f"https://b.zmtcdn.com/data/zomato_events/photos/{event_id % 1000:03d}/{event_id}.jpg",
+            "order": 0,
+            "id": event_id
+        }}],
+        "restaurants": [],
+        "title": rng.choice(EVENT_TITLES),
+        "description": "Join us for an evening of great food and drinks.",
+        "display_time": "08:00 pm onwards",
+        "event_category": 1
+    }}
+
+
+def generate_restaurant(rng, res_id, event_rate=0.12):
+    """
+    builds one synthetic restaurant entry, about event_rate of restaurants have 1 to 3 events
+    """
+    rating_text, low, high = rng.choices(RATING_TEXT_RANGES, weights=RATING_TEXT_WEIGHTS)[0]
+    country_id = rng.choices(list(COUNTRY_WEIGHTS), weights=list(COUNTRY_WEIGHTS.values()))[0]
+    city = rng.choice(CITIES)
+
+    events = []
+    if rng.random() < event_rate:
+        events = [generate_event(rng, res_id * 4 + i) for i in range(rng.randint(1, 3))]
+
+    return {"restaurant": {
+        "R": {"res_id": res_id},
+        "id": str(res_id),
+        "name": f"Restaurant {res_id}",
+        "url": f"https://www.zomato.com/restaurant-{res_id}",
+        "location": {
+            "address": f"{res_id % 500} Main Street, {city}",
+            "locality": f"Locality {res_id % 100}",
+            "city": city,
+            "latitude": f"{rng.uniform(-40, 60):.10f}",
+            "longitude": f"{rng.uniform(-120, 150):.10f}",
+            "zipcode": "",
+            "country_id": country_id
+        },
+        "cuisines": ", ".join(rng.sample(CUISINES, rng.randint(1, 4))),
+        "average_cost_for_two": rng.randrange(200, 5000, 50),
+        "price_range": rng.randint(1, 4),
+        "currency": "Rs.",
+        "offers": [],
+        "zomato_events": events,
+        "user_rating": {
+            "aggregate_rating": f"{rng.uniform(low, high):.1f}",
+            "rating_text": rating_text,
+            "rating_color": "5BA829",
+            "votes": str(rng.randrange(0, 5000)),
+            "has_fake_reviews": 0
+        }
+    }}
+
+
+def generate_restaurant_pages(restaurant_count, seed=0, page_size=20, first_res_id=1, duplicate_rate=0.01):
+    """
+    yields pages of synthetic restaurants like the paginated zomato search results
+    about duplicate_rate of restaurants repeat the previous restaurant, as the real dumps contain duplicates
+    """
+    rng = random.Random(seed)
+    restaurant = None
+
+    for start in range(0, restaurant_count, page_size):
+        restaurants = []
+        for res_id in range(first_res_id + start, first_res_id + min(start + page_size, restaurant_count)):
+            if restaurant is None or rng.random() >= duplicate_rate:
+                restaurant = generate_restaurant(rng, res_id)
+            restaurants.append(restaurant)
+
+        yield {"results_found": restaurant_count, "results_start": start + 1,
+               "results_shown": len(restaurants), "restaurants": restaurants}
+
+
+def write_restaurants_json(output_path, restaurant_count, seed=0, page_size=20, first_res_id=1):
+    """
+    writes restaurant_count synthetic restaurants to a raw json file page by page,
+    so files far larger than memory (e.g. 10M restaurants, roughly 7GB) can be generated
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output_path, "w", encoding="utf-8") as file:
+        file.write("[")
+        for i, page in enumerate(generate_restaurant_pages(restaurant_count, seed, page_size, first_res_id)):
+            if i:
+                file.write(",\n")
+            json.dump(page, file, ensure_ascii=False)
+        file.write("]")
+
+    return output_path
+
+
+def write_restaurants_json_shards(output_dir, restaurant_count, shard_count=1, seed=0):
+    """
+    splits restaurant_count synthetic restaurants across shard_count raw json files with distinct ids
+    returns the shard paths
+    """
+    shard_paths = []
+    shard_size = -(-restaurant_count // shard_count)
+    for shard in range(shard_count):
+        count = min(shard_size, restaurant_count - shard * shard_size)
+        if count <= 0:
+            break
+        shard_paths.append(write_restaurants_json(
+            Path(output_dir) / f"restaurants_{shard:03d}.json", count,
+            seed=seed + shard, first_res_id=shard * shard_size + 1))
+    return shard_paths
+
+
+def main():
+    """
+    writes a synthetic restaurants json file of the given size
+    """
+    parser = argparse.ArgumentParser(description="Generates a synthetic restaurants.json file.")
+    parser.add_argument("restaurant_count", type=int)
+    parser.add_argument("output_path")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_restaurants_json(args.output_path, args.restaurant_count, args.seed)
+    print(f"{args.restaurant_count} synthetic restaurants saved at: {args.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+from collections import defaultdict
+from pathlib import Path
+from intermediate_storage_module import read_table
+from output_writer_module import atomic_output
+
+# this module builds an inverted index from cuisine (and country) to restaurant ids
+# cuisines such as "North Indian, Chinese" are tokenized once when the index is built, every cuisine
+# and country maps to a sorted array of restaurant ids, so filters are array slices and intersections
+
+# get base directory
+BASE_DIR = Path(__file__).resolve().parent
+
+PREPROCESSED_DATA_DIR = BASE_DIR / "preprocessed_data"
+
+
+def tokenize_cuisines(cuisines):
+    """
+    splits a comma-joined cuisines string into cuisine names, missing or "NA" cuisines have none
+    """
+    if not isinstance(cuisines, str) or cuisines == "NA":
+        return []
+    return [cuisine.strip() for cuisine in cuisines.split(",") if cuisine.strip()]
+
+
+def _postings(keys, restaurant_ids):
+    """
+    groups restaurant ids by key, returns the sorted distinct keys and, in CSR layout,
+    offsets and the sorted distinct restaurant ids of each key
+    """
+    pairs = pd.DataFrame({"key": keys, "restaurant_id": restaurant_ids}).drop_duplicates()
+    pairs = pairs.sort_values(["key", "restaurant_id"], kind="stable")
+    unique_keys, counts = np.unique(pairs["key"].to_numpy(), return_counts=True)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return unique_keys, offsets, pairs["restaurant_id"].to_numpy(dtype=np.int64)
+
+
+class CuisineIndex:
+    """
+    inverted index from cuisine and country code to sorted restaurant id arrays
+    postings are stored as one id array per dimension with offsets (CSR), so a lookup is a slice
+    """
+
+    def __init__(self, cuisine_names, cuisine_offsets, cuisine_ids, country_codes, country_offsets, country_ids):
+        self.cuisine_names = np.asarray(cuisine_names, dtype=str)
+        self.cuisine_offsets = cuisine_offsets
+        self.cuisine_ids = cuisine_ids
+        self.country_codes = country_codes
+        self.country_offsets = country_offsets
+        self.country_ids = country_ids
+        # cuisines are looked up case-insensitively, names differing only by case (e.g. "Bar Food" and
+        # "Bar food") are looked up together
+        self._cuisine_positions = defaultdict(list)
+        for i, name in enumerate(self.cuisine_names):
+            self._cuisine_positions[name.casefold()].append(i)
+        self._country_positions = {int(code): i for i, code in enumerate(country_codes)}
+
+    @classmethod
+    def from_dataframe(cls, restaurant_df):
+        """
+        builds the index from a restaurant table with restaurant_id, cuisines and country columns
+        each distinct cuisines string is tokenized once, however many restaurants share it
+        """
+        restaurant_ids = pd.to_numeric(restaurant_df["restaurant_id"], errors="coerce")
+        valid = restaurant_ids.notna().to_numpy()
+        restaurant_ids = restaurant_ids[valid].to_numpy(dtype=np.int64)
+
+        cuisines = restaurant_df["cuisines"][valid].astype("category")
+        tokens = [tokenize_cuisines(value) for value in cuisines.cat.categories]
+        names = np.array(sorted({name for category_names in tokens for name in category_names}), dtype=str)
+        name_ids = {name: i for i, name in enumerate(names)}
+        # (category, cuisine id) pairs, joined to the restaurants through the category codes
+        token_categories = np.repeat(np.arange(len(tokens)), [len(category_names) for category_names in tokens])
+        token_ids = np.array([name_ids[name] for category_names in tokens for name in category_names],
+                             dtype=np.int64)
+
+        codes = cuisines.cat.codes.to_numpy()
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(tokens) + 1))
+        rows = [order[bounds[category]:bounds[category + 1]] for category in token_categories]
+        row_token_ids = np.repeat(token_ids, [len(positions) for positions in rows])
+        row_ids = restaurant_ids[np.concatenate(rows)] if rows else np.empty(0, dtype=np.int64)
+        cuisine_keys, cuisine_offsets, cuisine_ids = _postings(row_token_ids, row_ids)
+        cuisine_names = names[cuisine_keys]
+
+        countries = pd.to_numeric(restaurant_df["country"][valid], errors="coerce")
+        has_country = countries.notna().to_numpy()
+        country_codes, country_offsets, country_ids = _postings(
+            countries[has_country].to_numpy(dtype=np.int64), restaurant_ids[has_country])
+
+        return cls(cuisine_names, cuisine_offsets, cuisine_ids, country_codes, country_offsets, country_ids)
+
+    @classmethod
+    def from_table(cls, preprocessed_path):
+        """
+        builds the index from a preprocessed restaurant table, only loading the columns it needs
+        """
+        return cls.from_dataframe(read_table(preprocessed_path, columns=["restaurant_id", "cuisines", "country"]))
+
+    def save(self, output_path):
+        """
+        saves the index arrays to an .npz file, which only replaces output_path once complete
+        """
+        # written through a file object, np.savez would append ".npz" to the temporary path
+        with atomic_output(output_path) as temp_path, open(temp_path, "wb") as file:
+            np.savez(file, cuisine_names=self.cuisine_names, cuisine_offsets=self.cuisine_offsets,
+                     cuisine_ids=self.cuisine_ids, country_codes=self.country_codes,
+                     country_offsets=self.country_offsets, country_ids=self.country_ids)
+
+    @classmethod
+    def load(cls, index_path):
+        """
+        loads an index saved with save()
+        """
+        with np.load(index_path) as arrays:
+            return cls(**{name: arrays[name] for name in arrays.files})
+
+    def cuisines(self):
+        """
+        returns the number of restaurants serving each cuisine, most common first
+        """
+        counts = pd.Series(np.diff(self.cuisine_offsets), index=self.cuisine_names, name="restaurants")
+        return counts.sort_values(ascending=False, kind="stable")
+
+    def restaurants_with_cuisine(self, cuisine):
+        """
+        returns the sorted ids of restaurants serving cuisine (case-insensitive), empty if unknown
+        """
+        positions = self._cuisine_positions.get(cuisine.strip().casefold(), [])
+        postings = [self.cuisine_ids[self.cuisine_offsets[position]:self.cuisine_offsets[position + 1]]
+                    for position in positions]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        if len(postings) == 1:
+            return postings[0]
+        return np.unique(np.concatenate(postings))
+
+    def restaurants_in_country(self, country_code):
+        """
+        returns the sorted ids of restaurants with the given country code, empty if unknown
+        """
+        position = self._country_positions.get(int(country_code))
+        if position is None:
+            return np.empty(0, dtype=np.int64)
+        return self.country_ids[self.country_offsets[position]:self.country_offsets[position + 1]]
+
+    def query(self, cuisines, country_code=None, match="all"):
+        """
+        returns the sorted ids of restaurants serving all (match="all") or any (match="any") of cuisines,
+        restricted to country_code if given, e.g. query(["Japanese", "Sushi"], country_code=1)
+        with no cuisines every restaurant with a cuisine is matched, a single cuisine can be given as a string
+        """
+        if match not in ("all", "any"):
+            raise ValueError('match must be "all" or "any".')
+        if isinstance(cuisines, str):
+            cuisines = [cuisines]
+
+        # intersect the shortest postings first so intermediate results stay small
+        postings = sorted((self.restaurants_with_cuisine(cuisine) for cuisine in cuisines), key=len)
+        if not postings:
+            result = np.unique(self.cuisine_ids)
+        elif match == "all":
+            result = postings[0]
+            for ids in postings[1:]:
+                result = np.intersect1d(result, ids, assume_unique=True)
+        else:
+            result = np.unique(np.concatenate(postings))
+
+        if country_code is not None:
+            result = np.intersect1d(result, self.restaurants_in_country(country_code), assume_unique=True)
+        return result
+
+
+def build_cuisine_index(preprocessed_path, index_output_path):
+    """
+    builds the cuisine index of the preprocessed restaurant details and saves it to index_output_path
+    """
+    index = CuisineIndex.from_table(preprocessed_path)
+    index.save(index_output_path)
+    print(f"\n Indexed {len(index.cuisine_names)} cuisines over {len(index.country_codes)} countries")
+    print(f"\n Most Common Cuisines \n \n {index.cuisines().head()}")
+    return index
+
+
+def main():
+    """
+    runs cuisine index module standalone
+    """
+    preprocessed_path = PREPROCESSED_DATA_DIR / "preprocessed_restaurant_details.parquet"
+    index_output_path = PREPROCESSED_DATA_DIR / "cuisine_index.npz"
+
+    build_cuisine_index(preprocessed_path, index_output_path)
+
+
+if __name__ == "__main__":
+    main()
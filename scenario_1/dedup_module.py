@@ -0,0 +1,162 @@
+import shutil
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# this module drops duplicate rows while they are streamed in batches, keeping the first occurrence
+# like DataFrame.drop_duplicates(), only a 64 bit fingerprint of each distinct row is kept in memory
+# and fingerprints are spilled to sorted files on disk once there are too many
+
+
+# sorted runs of batch fingerprints kept before merging them into the sorted fingerprint array
+MAX_BATCH_RUNS = 16
+
+# kinds of values in object columns, values of different kinds are never duplicates
+MISSING_KIND, TEXT_KIND, NUMBER_KIND, OTHER_KIND = 0, 1, 2, 3
+
+
+def object_column_keys(column, values):
+    """
+    splits an object column into the kind, numeric value and text of each value, so rows are equal exactly
+    when drop_duplicates over several columns finds them equal: 1, 1.0 and True match, as do None and NaN,
+    but 1 and "1" do not (pd.util.hash_pandas_object hashes object values through their string form)
+    """
+    is_missing = values.isna().to_numpy()
+    is_text = values.map(type).eq(str).to_numpy()
+    numbers = pd.to_numeric(values.where(~(is_missing | is_text)), errors="coerce")
+    is_number = numbers.notna().to_numpy()
+
+    kinds = np.select([is_missing, is_text, is_number], [MISSING_KIND, TEXT_KIND, NUMBER_KIND], OTHER_KIND)
+    return {
+        f"{column}__kind": pd.Series(kinds.astype(np.int8), index=values.index),
+        f"{column}__number": numbers.fillna(0).astype(np.float64),
+        f"{column}__text": values.where(is_text | (kinds == OTHER_KIND), "").astype(str)
+    }
+
+
+class StreamingDeduplicator:
+    """
+    remembers fingerprints of the rows it has seen to tell first occurrences from duplicates
+    rows are identified by key_columns (all columns by default)
+
+    fingerprints are the 64 bit row hashes of pd.util.hash_pandas_object, two different rows get the same
+    fingerprint with probability ~n^2 / 2^65 (about 3e-6 for 10M distinct rows), in which case the later
+    one is dropped; fingerprints are held in sorted arrays, once they hold more than max_memory_fingerprints
+    they are merged and written as a sorted run to spill_dir (a temporary directory by default) and memory mapped
+    """
+
+    def __init__(self, key_columns=None, max_memory_fingerprints=4_000_000, spill_dir=None):
+        self.key_columns = key_columns
+        self.max_memory_fingerprints = max_memory_fingerprints
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        self._temp_dir = None
+        self._fingerprints = np.empty(0, dtype=np.uint64)
+        self._batch_runs = []
+        self._batch_run_size = 0
+        self._spilled_runs = []
+        self._spilled_paths = []
+        self._unique_count = 0
+
+    def __len__(self):
+        return self._unique_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def fingerprints(self, df):
+        """
+        returns the 64 bit fingerprint of each row's key columns
+        """
+        key_df = df if self.key_columns is None else df[self.key_columns]
+        hashed_columns = {}
+        for column in key_df.columns:
+            values = key_df[column]
+            if values.dtype == object:
+                hashed_columns.update(object_column_keys(column, values))
+            else:
+                hashed_columns[column] = values
+        return pd.util.hash_pandas_object(
+            pd.DataFrame(hashed_columns, copy=False), index=False).to_numpy(dtype=np.uint64)
+
+    def unique_mask(self, df):
+        """
+        records a batch of rows, returns a boolean array marking rows seen for the first time
+        """
+        mask = np.zeros(len(df), dtype=bool)
+        if len(df) == 0:
+            return mask
+
+        # first occurrence of each fingerprint within the batch
+        batch_fingerprints, first_positions = np.unique(self.fingerprints(df), return_index=True)
+        new = ~self._contains(batch_fingerprints)
+        mask[first_positions[new]] = True
+
+        self._add(batch_fingerprints[new])
+        return mask
+
+    def drop_duplicates(self, df):
+        """
+        returns the rows of a batch that were not seen before, keeping their first occurrence
+        """
+        return df[self.unique_mask(df)]
+
+    def _contains(self, sorted_fingerprints):
+        found = np.zeros(len(sorted_fingerprints), dtype=bool)
+        for run in [self._fingerprints] + self._batch_runs + self._spilled_runs:
+            if len(run):
+                positions = np.searchsorted(run, sorted_fingerprints).clip(max=len(run) - 1)
+                found |= run[positions] == sorted_fingerprints
+        return found
+
+    def _add(self, sorted_fingerprints):
+        """
+        keeps the new fingerprints of a batch as their own sorted run, runs are merged into the sorted array
+        once they add up to a quarter of it (or there are MAX_BATCH_RUNS), so the array is not reallocated
+        on every batch
+        """
+        self._unique_count += len(sorted_fingerprints)
+        self._batch_runs.append(sorted_fingerprints)
+        self._batch_run_size += len(sorted_fingerprints)
+        if self._batch_run_size * 4 >= len(self._fingerprints) or len(self._batch_runs) >= MAX_BATCH_RUNS:
+            self._merge_batch_runs()
+        if len(self._fingerprints) + self._batch_run_size >= self.max_memory_fingerprints:
+            self._merge_batch_runs()
+            self._spill()
+
+    def _merge_batch_runs(self):
+        if self._batch_runs:
+            self._fingerprints = np.sort(np.concatenate([self._fingerprints] + self._batch_runs))
+            self._batch_runs = []
+            self._batch_run_size = 0
+
+    def _spill(self):
+        """
+        writes the in-memory fingerprints to disk as a sorted run and memory maps it
+        """
+        if self.spill_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix="dedup_")
+            self.spill_dir = Path(self._temp_dir)
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        run_path = self.spill_dir / f"fingerprints_{id(self):x}_{len(self._spilled_paths):04d}.npy"
+        np.save(run_path, self._fingerprints)
+        self._spilled_paths.append(run_path)
+        self._spilled_runs.append(np.load(run_path, mmap_mode="r"))
+        self._fingerprints = np.empty(0, dtype=np.uint64)
+
+    def close(self):
+        """
+        deletes spilled fingerprint files
+        """
+        self._spilled_runs = []
+        for run_path in self._spilled_paths:
+            run_path.unlink(missing_ok=True)
+        self._spilled_paths = []
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+            self.spill_dir = None
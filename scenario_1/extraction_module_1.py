@@ -1,6 +1,13 @@
 import pandas as pd
-import openpyxl
+import numpy as np
+import hashlib
+import json
+from contextlib import nullcontext
 from pathlib import Path
+from intermediate_storage_module import read_table, iter_table_chunks, prepare_csv_export, file_content_hash, \
+    apply_typed_schema
+from output_writer_module import write_csv, write_csv_chunks, write_json_atomically
+from sql_store_module import TableLoader, load_table
 
 # this module extracts and saves restaurant details to restaurant_details.csv
 # only include restaurants with matching Country Codes from Country-Code.xlsx
@@ -12,11 +19,32 @@ BASE_DIR = Path(__file__).resolve().parent
 RAW_DATA_DIR = BASE_DIR / "raw_data"
 PREPROCESSED_DATA_DIR = BASE_DIR / "preprocessed_data"
 OUTPUT_DATA_DIR = BASE_DIR / "output/task_1"
+COUNTRY_CODE_CACHE_DIR = PREPROCESSED_DATA_DIR / "cache"
 
+# columns of the restaurant details output
+COLUMNS_TO_KEEP = [
+    "restaurant_id", "restaurant_name", "country", "city",
+    "user_rating_votes", "user_aggregate_rating", "cuisines", "event_date"
+]
 
-def load_country_codes(country_excel_path):
+# restaurant dimensions carried as categoricals, country becomes one when codes are mapped to names
+CATEGORICAL_COLUMNS = ["city", "cuisines"]
+
+# numeric columns get the same types whatever the input, csv chunks would otherwise have their types
+# inferred one chunk at a time (votes read as 10 in one chunk and 10.0 in a chunk with a missing value)
+NUMERIC_COLUMN_TYPES = {
+    "restaurant_id": "Int64",
+    "user_rating_votes": "Int64",
+    "user_aggregate_rating": "float64"
+}
+
+# country code mappings already loaded in this process, keyed on workbook path, mtime and size
+_country_mapping_memo = {}
+
+
+def parse_country_code_workbook(country_excel_path):
     """
-    returns a dictionary with country code mappings
+    parses the country code excel workbook into a dictionary of country code mappings
     """
     country_df = pd.read_excel(country_excel_path, engine='openpyxl')
 
@@ -27,55 +55,170 @@ def load_country_codes(country_excel_path):
     return country_mapping
 
 
-def filter_restaurant_details(preprocessed_csv_path, country_excel_path, output_path):
+def load_country_codes(country_excel_path, cache_dir=None):
     """
-    reads preprocessed restaurant data, filters based on valid country codes, and extracts required fields
-    saves the filtered restaurant details to "restaurant_details.csv"
+    returns a dictionary with country code mappings
+    if cache_dir is given the parsed mapping is cached there as json, keyed on the workbook's mtime, size
+    and content hash, so workers only parse the xlsx once after it changes
     """
-    # load preprocessed restaurant data
-    restaurant_df = pd.read_csv(preprocessed_csv_path, index_col=None)
+    country_excel_path = Path(country_excel_path)
+    stat = country_excel_path.stat()
+    memo_key = (str(country_excel_path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if memo_key in _country_mapping_memo:
+        return _country_mapping_memo[memo_key]
+
+    cache_path = None
+    cache = None
+    if cache_dir is not None:
+        # one cache file per workbook location
+        path_digest = hashlib.sha256(memo_key[0].encode("utf-8")).hexdigest()[:16]
+        cache_path = Path(cache_dir) / f"country_codes_{path_digest}.json"
+        if cache_path.exists():
+            with open(cache_path, "r", encoding="utf-8") as file:
+                cache = json.load(file)
+
+    country_mapping = None
+    if cache is not None:
+        if cache["mtime_ns"] == stat.st_mtime_ns and cache["size"] == stat.st_size:
+            country_mapping = dict(zip(cache["codes"], cache["countries"]))
+        else:
+            # workbook was touched, only re-parse if its content actually changed
+            content_hash = file_content_hash(country_excel_path)
+            if cache["sha256"] == content_hash:
+                country_mapping = dict(zip(cache["codes"], cache["countries"]))
+                cache.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                write_json_atomically(cache, cache_path)
+
+    if country_mapping is None:
+        country_mapping = parse_country_code_workbook(country_excel_path)
+        if cache_path is not None:
+            write_json_atomically({
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": file_content_hash(country_excel_path),
+                "codes": [code.item() if isinstance(code, np.generic) else code
+                          for code in country_mapping],
+                "countries": list(country_mapping.values())
+            }, cache_path)
+
+    _country_mapping_memo[memo_key] = country_mapping
+    return country_mapping
 
-    # load country code mappings
-    country_mapping = load_country_codes(country_excel_path)
 
-    # convert country codes to country names
-    restaurant_df["country"] = restaurant_df["country"].map(
-        country_mapping).fillna("NA")
+def map_country_codes(country_codes, country_mapping):
+    """
+    maps a series of country codes to a categorical series of country names, unknown codes become missing values
+    integer codes are mapped with a vectorized array lookup, other codes fall back to Series.map
+    """
+    integer_keys = all(isinstance(code, (int, np.integer)) and not isinstance(code, bool)
+                       for code in country_mapping)
+    if not (integer_keys and country_mapping and pd.api.types.is_integer_dtype(country_codes)):
+        return country_codes.map(country_mapping).astype("category")
+
+    if min(country_mapping) < 0:
+        return country_codes.map(country_mapping).astype("category")
 
-    # filter out rows where country is "NA"
-    restaurant_df = restaurant_df[restaurant_df["country"] != "NA"]
+    # lookup table from code to the position of its name in the categories, -1 for unknown codes
+    names = pd.Index(pd.unique(pd.Series(list(country_mapping.values()), dtype=object).dropna()))
+    lookup = np.full(max(country_mapping) + 1, -1, dtype=np.intp)
+    lookup[np.fromiter(country_mapping, dtype=np.int64)] = names.get_indexer(
+        list(country_mapping.values()))
 
-    # ensure correct data types
-    restaurant_df["user_aggregate_rating"] = pd.to_numeric(
-        restaurant_df["user_aggregate_rating"], errors='coerce')
+    codes = country_codes.to_numpy(dtype=np.int64, na_value=-1)
+    in_range = (codes >= 0) & (codes < len(lookup))
+    name_codes = np.full(len(codes), -1, dtype=np.intp)
+    name_codes[in_range] = lookup[codes[in_range]]
 
-    # select required columns
-    columns_to_keep = [
-        "restaurant_id", "restaurant_name", "country", "city",
-        "user_rating_votes", "user_aggregate_rating", "cuisines", "event_date"
-    ]
+    return pd.Series(pd.Categorical.from_codes(name_codes, categories=names),
+                     index=country_codes.index)
+
+
+def filter_restaurant_rows(restaurant_df, country_mapping):
+    """
+    keeps restaurants with a valid country code, maps codes to country names and returns the
+    COLUMNS_TO_KEEP columns with their types (prepare_csv_export formats them for csv)
+    """
+    restaurant_df = restaurant_df.copy()
+
+    # repetitive dimensions are kept dictionary-encoded (csv inputs are read as plain strings)
+    for column in CATEGORICAL_COLUMNS:
+        restaurant_df[column] = restaurant_df[column].astype("category")
+
+    # convert country codes to categorical country names
+    restaurant_df["country"] = map_country_codes(
+        restaurant_df["country"], country_mapping)
+
+    # filter out rows without a valid country
+    restaurant_df = restaurant_df[restaurant_df["country"].notna()]
+
+    # ensure correct data types
+    numeric_columns = list(NUMERIC_COLUMN_TYPES)
+    restaurant_df[numeric_columns] = apply_typed_schema(restaurant_df[numeric_columns], NUMERIC_COLUMN_TYPES)
 
     # filter df for columns to keep
-    filtered_df = restaurant_df[columns_to_keep]
-    # replace missing values with "NA"
-    filtered_df = filtered_df.fillna("NA")
+    return restaurant_df[COLUMNS_TO_KEEP]
 
-    filtered_df.to_csv(output_path, index=False)
 
-    print(f"\n Data Preview \n \n {filtered_df.head()}")
+def filter_restaurant_details(preprocessed_path, country_excel_path, output_path, country_cache_dir=None,
+                              chunk_size=None, database_path=None):
+    """
+    reads preprocessed restaurant data, filters based on valid country codes, and extracts required fields
+    saves the filtered restaurant details to "restaurant_details.csv" (gzip or zstd compressed for a
+    ".gz" or ".zst" output path)
+    country_cache_dir is passed to load_country_codes to reuse the parsed country codes across runs
+    with chunk_size, the table is streamed chunk_size rows at a time and each filtered chunk is appended
+    to the output, so memory is bounded by the chunk size rather than the table size
+    if database_path is given the filtered rows are also loaded into its restaurant_details table
+    """
+    # load country code mappings
+    country_mapping = load_country_codes(
+        country_excel_path, cache_dir=country_cache_dir)
+
+    if chunk_size is None:
+        # load only the required columns of the preprocessed restaurant data
+        filtered_df = filter_restaurant_rows(
+            read_table(preprocessed_path, columns=COLUMNS_TO_KEEP), country_mapping)
+        # replace missing values with "NA"
+        export_df = prepare_csv_export(filtered_df)
+        write_csv(export_df, output_path)
+        if database_path is not None:
+            load_table(database_path, "restaurant_details", filtered_df)
+        preview_df = export_df.head()
+    else:
+        # the first rows written are kept for the preview, an empty table still writes the header
+        previews = [pd.DataFrame(columns=COLUMNS_TO_KEEP)]
+
+        def filtered_chunks(loader):
+            yield previews[0]
+            for chunk in iter_table_chunks(preprocessed_path, columns=COLUMNS_TO_KEEP, chunk_size=chunk_size):
+                filtered_chunk = filter_restaurant_rows(chunk, country_mapping)
+                if loader is not None:
+                    loader.append(filtered_chunk)
+                # replace missing values with "NA"
+                filtered_chunk = prepare_csv_export(filtered_chunk)
+                if sum(map(len, previews)) < 5:
+                    previews.append(filtered_chunk.head())
+                yield filtered_chunk
+
+        with TableLoader(database_path, "restaurant_details") if database_path is not None \
+                else nullcontext() as loader:
+            write_csv_chunks(filtered_chunks(loader), output_path)
+        preview_df = pd.concat(previews).head()
+
+    print(f"\n Data Preview \n \n {preview_df}")
 
 
 def main():
     """
     runs extraction module 1 standalone
     """
-    preprocessed_csv_path = PREPROCESSED_DATA_DIR / \
-        "preprocessed_restaurant_details.csv"
+    preprocessed_path = PREPROCESSED_DATA_DIR / \
+        "preprocessed_restaurant_details.parquet"
     country_excel_path = RAW_DATA_DIR / "Country-Code.xlsx"
     output_csv_path = OUTPUT_DATA_DIR / "restaurant_details.csv"
 
-    filter_restaurant_details(preprocessed_csv_path,
-                              country_excel_path, output_csv_path)
+    filter_restaurant_details(preprocessed_path,
+                              country_excel_path, output_csv_path, country_cache_dir=COUNTRY_CODE_CACHE_DIR)
 
 
 if __name__ == "__main__":
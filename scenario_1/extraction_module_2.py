@@ -1,6 +1,10 @@
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import datetime
+from intermediate_storage_module import read_table, prepare_csv_export, parse_dates
+from output_writer_module import write_csv
+from sql_store_module import load_table
 
 # this module extracts April 2019 events to restaurant_events.csv:
 
@@ -12,10 +16,165 @@ PREPROCESSED_DATA_DIR = BASE_DIR / "preprocessed_data"
 OUTPUT_DATA_DIR = BASE_DIR / "output/task_2"
 
 
-def filter_events_by_date(preprocessed_csv_path, output_path, start_date, end_date):
+# select required columns, change accordingly
+COLUMNS_TO_KEEP = [
+    "event_id", "restaurant_id", "restaurant_name",
+    "photo_url", "event_title", "event_start_date", "event_end_date"
+]
+
+
+# integer value of NaT in a datetime64[ns] array viewed as int64
+NAT_VALUE = np.iinfo(np.int64).min
+
+
+class EventIntervalIndex:
+    """
+    index over event start and end dates for date window queries
+    events with both dates are stored in a centered interval tree, events missing one date in sorted arrays,
+    so a query costs O(log n + matches) instead of evaluating masks over every event
+
+    an event matches the window [start_date, end_date] if
+    - it overlaps the window (end >= start_date and start <= end_date)
+    - it has no end date and starts on or after start_date
+    - it has no start date and ends on or before end_date
+    """
+
+    def __init__(self, start_dates, end_dates):
+        starts = _to_nanoseconds(start_dates)
+        ends = _to_nanoseconds(end_dates)
+        positions = np.arange(len(starts))
+        start_missing = starts == NAT_VALUE
+        end_missing = ends == NAT_VALUE
+
+        # valid start, missing end: sorted by start
+        open_ended = ~start_missing & end_missing
+        order = np.argsort(starts[open_ended], kind="stable")
+        self._open_end_starts = starts[open_ended][order]
+        self._open_end_positions = positions[open_ended][order]
+
+        # missing start, valid end: sorted by end
+        open_started = start_missing & ~end_missing
+        order = np.argsort(ends[open_started], kind="stable")
+        self._open_start_ends = ends[open_started][order]
+        self._open_start_positions = positions[open_started][order]
+
+        # end before start cannot be placed in the tree, these rare rows are checked directly
+        both_valid = ~start_missing & ~end_missing
+        inverted = both_valid & (starts > ends)
+        self._inverted_starts = starts[inverted]
+        self._inverted_ends = ends[inverted]
+        self._inverted_positions = positions[inverted]
+
+        intervals = both_valid & ~inverted
+        self._tree = _build_interval_tree(
+            starts[intervals], ends[intervals], positions[intervals])
+        self.size = len(starts)
+
+    def query(self, start_date, end_date):
+        """
+        returns the sorted row positions of events matching the window [start_date, end_date]
+        """
+        window_start = pd.Timestamp(start_date).value
+        window_end = pd.Timestamp(end_date).value
+
+        matches = [
+            self._open_end_positions[np.searchsorted(
+                self._open_end_starts, window_start, side="left"):],
+            self._open_start_positions[:np.searchsorted(
+                self._open_start_ends, window_end, side="right")],
+            self._inverted_positions[(self._inverted_ends >= window_start) & (
+                self._inverted_starts <= window_end)]
+        ]
+
+        stack = [self._tree] if self._tree is not None else []
+        while stack:
+            node = stack.pop()
+            center, by_start, by_start_positions, by_end, by_end_positions, left, right = node
+
+            if window_end < center:
+                # all intervals at this node end after the window, keep those starting before it ends
+                matches.append(by_start_positions[:np.searchsorted(
+                    by_start, window_end, side="right")])
+                if left is not None:
+                    stack.append(left)
+            elif window_start > center:
+                # all intervals at this node start before the window, keep those ending after it starts
+                matches.append(by_end_positions[np.searchsorted(
+                    by_end, window_start, side="left"):])
+                if right is not None:
+                    stack.append(right)
+            else:
+                # window contains the center, every interval at this node overlaps it
+                matches.append(by_start_positions)
+                if left is not None:
+                    stack.append(left)
+                if right is not None:
+                    stack.append(right)
+
+        return np.sort(np.concatenate(matches))
+
+
+def _to_nanoseconds(dates):
+    """
+    converts a date series to int64 nanoseconds, missing dates become NAT_VALUE
+    """
+    dates, _ = parse_dates(dates)
+    return dates.to_numpy().view(np.int64)
+
+
+def _build_interval_tree(starts, ends, positions):
+    """
+    builds a centered interval tree node (center, starts sorted, positions by start, ends sorted, positions by end,
+    left, right), the center is the median start so every node holds at least one interval
+    """
+    if len(starts) == 0:
+        return None
+
+    center = np.partition(starts, len(starts) // 2)[len(starts) // 2]
+    at_center = (starts <= center) & (ends >= center)
+    to_left = ends < center
+    to_right = starts > center
+
+    start_order = np.argsort(starts[at_center], kind="stable")
+    end_order = np.argsort(ends[at_center], kind="stable")
+    return (
+        center,
+        starts[at_center][start_order],
+        positions[at_center][start_order],
+        ends[at_center][end_order],
+        positions[at_center][end_order],
+        _build_interval_tree(
+            starts[to_left], ends[to_left], positions[to_left]),
+        _build_interval_tree(
+            starts[to_right], ends[to_right], positions[to_right])
+    )
+
+
+def load_events(preprocessed_path):
+    """
+    loads preprocessed event data with parsed dates and builds its EventIntervalIndex
+    the returned (event_df, event_index) pair can be reused for any number of date windows
+    """
+    # load preprocessed event data, parquet input already stores datetimes so no dates are parsed,
+    # csv input is parsed with the fixed date format
+    event_df = read_table(preprocessed_path, columns=COLUMNS_TO_KEEP)
+
+    for column in ["event_start_date", "event_end_date"]:
+        event_df[column], invalid_count = parse_dates(event_df[column])
+        if invalid_count:
+            print(f"Warning: {invalid_count} invalid {column} value(s) treated as missing")
+
+    event_index = EventIntervalIndex(
+        event_df["event_start_date"], event_df["event_end_date"])
+    return event_df, event_index
+
+
+def filter_events_by_date(preprocessed_path, output_path, start_date, end_date, events=None, database_path=None):
     """
     reads preprocessed event data and filters for events within a start and end date
-    saves filtered data to "restaurant_events.csv"
+    saves filtered data to "restaurant_events.csv" (gzip or zstd compressed for a ".gz" or ".zst" output path)
+    events can be a (event_df, event_index) pair from load_events to avoid reloading the data
+    if database_path is given the filtered events are also loaded into its restaurant_events table
     """
 
     # check if user inputted date is properly formatted
@@ -30,60 +189,78 @@ def filter_events_by_date(preprocessed_csv_path, output_path, start_date, end_da
         print(f'Error: Invalid date format. {e}')
         return
 
-    # load preprocessed event data
-    event_df = pd.read_csv(preprocessed_csv_path, index_col=None)
-
-    event_df["event_start_date"] = pd.to_datetime(
-        event_df["event_start_date"], errors="coerce")
-    event_df["event_end_date"] = pd.to_datetime(
-        event_df["event_end_date"], errors="coerce")
-
-    # filter for events that fall within start and end date
-    filtered_df = event_df[
-        (
-            (event_df["event_end_date"] >= start_date) & (
-                event_df["event_start_date"] <= end_date)
-        ) |
-        # allow for valid start date but missing/invalid end date
-        (
-            (event_df["event_start_date"] >=
-             start_date) & event_df["event_end_date"].isna()
-        ) |
-        # allow for valid end date but missing/invalid start date
-        (
-            (event_df["event_end_date"] <=
-             end_date) & event_df["event_start_date"].isna()
-        )
-    ]
-
-    # select required columns, change accordingly
-    columns_to_keep = [
-        "event_id", "restaurant_id", "restaurant_name",
-        "photo_url", "event_title", "event_start_date", "event_end_date"
-    ]
+    if events is None:
+        events = load_events(preprocessed_path)
+    event_df, event_index = events
+
+    # filter for events that fall within start and end date,
+    # allowing for valid start or end date with the other date missing/invalid
+    filtered_df = event_df.iloc[event_index.query(start_date, end_date)]
 
     # filter for selected columns
-    filtered_df = filtered_df[columns_to_keep]
+    filtered_df = filtered_df[COLUMNS_TO_KEEP]
+    if database_path is not None:
+        load_table(database_path, "restaurant_events", filtered_df)
 
     # replace missing values with "NA"
-    filtered_df = filtered_df.fillna("NA")
-    filtered_df.to_csv(output_path, index=False)
+    filtered_df = prepare_csv_export(filtered_df)
+    write_csv(filtered_df, output_path)
 
     print(
         f"\nData Preview for Events from {start_date} to {end_date}\n\n{filtered_df.head()}")
 
+    return filtered_df
+
+
+def date_windows(start_date, end_date, freq):
+    """
+    splits start_date to end_date into consecutive (start, end) windows,
+    freq is a pandas period frequency such as "M" for calendar months or "W" for weeks
+    """
+    periods = pd.period_range(start_date, end_date, freq=freq)
+    return [(max(period.start_time.normalize(), pd.Timestamp(start_date)),
+             min(period.end_time.normalize(), pd.Timestamp(end_date)))
+            for period in periods]
+
+
+def filter_events_by_date_windows(preprocessed_path, output_dir, windows):
+    """
+    filters events for each (start_date, end_date) window, the events are loaded and indexed once
+    each window is written to output_dir / "window=<start>_<end>" / "restaurant_events.csv"
+    with the same columns and "NA" filling as filter_events_by_date
+    returns a dictionary of window to output path for every valid window
+    """
+    events = load_events(preprocessed_path)
+    output_paths = {}
+
+    for start_date, end_date in windows:
+        try:
+            partition = f"window={pd.Timestamp(start_date):%Y-%m-%d}_{pd.Timestamp(end_date):%Y-%m-%d}"
+        except Exception as e:
+            print(f'Error: Invalid date format. {e}')
+            continue
+
+        # the partition directory is only created when the window is valid and its file is written
+        output_path = Path(output_dir) / partition / "restaurant_events.csv"
+        filtered_df = filter_events_by_date(
+            preprocessed_path, output_path, start_date, end_date, events=events)
+        if filtered_df is not None:
+            output_paths[(start_date, end_date)] = output_path
+
+    return output_paths
+
 
 def main():
     """
     runs extraction module 2 standalone
     """
-    preprocessed_event_csv_path = PREPROCESSED_DATA_DIR / "preprocessed_event_data.csv"
+    preprocessed_event_path = PREPROCESSED_DATA_DIR / "preprocessed_event_data.parquet"
     output_event_csv_path = OUTPUT_DATA_DIR / "restaurant_events.csv"
 
     start_date = "2019-04-01"
     end_date = "2019-04-30"
 
-    filter_events_by_date(preprocessed_event_csv_path,
+    filter_events_by_date(preprocessed_event_path,
                           output_event_csv_path, start_date, end_date)
 
 
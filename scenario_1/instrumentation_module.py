@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+import cProfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from output_writer_module import write_json_atomically
+from pipeline_module import Task
+
+try:
+    import resource
+except ImportError:
+    # resource is only available on unix, peak rss is not recorded elsewhere
+    resource = None
+
+# this module records wall time, cpu time, memory and row counts of pipeline steps,
+# writes them to a metrics json file per run and optionally profiles selected steps with cProfile
+
+BYTES_PER_MB = 1024 * 1024
+
+
+def peak_rss_mb():
+    """
+    returns the peak resident set size of this process in MB, or None if it cannot be measured
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on linux
+    return max_rss / BYTES_PER_MB if sys.platform == "darwin" else max_rss / 1024
+
+
+def child_cpu_time():
+    """
+    returns the cpu time used by finished child processes (e.g. extraction worker processes)
+    """
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def table_row_count(path, chunk_size=1_000_000):
+    """
+    returns the number of rows of a parquet or csv table, or None for other files and missing tables
+    parquet row counts come from the file metadata, csv files are read one column at a time
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    # only loaded once a table is counted, so runs where every step is skipped start without pandas
+    import pandas as pd
+    import pyarrow.parquet as pq
+    from intermediate_storage_module import is_parquet_path
+
+    if is_parquet_path(path):
+        return pq.read_metadata(path).num_rows
+    if path.suffix == ".csv":
+        return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=chunk_size))
+    return None
+
+
+def table_row_counts(paths):
+    """
+    returns the total number of rows of the tables among paths, or None if none of them is a table
+    """
+    counts = [count for count in map(table_row_count, paths) if count is not None]
+    return sum(counts) if counts else None
+
+
+class PipelineMetrics:
+    """
+    collects metrics of the steps of one pipeline run
+    steps listed in profile_steps are profiled with cProfile and their stats saved next to the metrics file
+    with trace_memory=True the peak python heap allocation of each step is recorded with tracemalloc,
+    steps should then run one at a time since tracemalloc peaks are process wide
+    """
+
+    def __init__(self, metrics_dir, profile_steps=(), trace_memory=False):
+        self.metrics_dir = Path(metrics_dir)
+        self.profile_steps = set(profile_steps)
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now()
+        # microseconds and the process id keep runs started in the same second from sharing a metrics file
+        self.run_id = f"{self.started_at:%Y%m%dT%H%M%S_%f}_{os.getpid()}"
+        self.steps = {}
+        self._start_time = time.perf_counter()
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def measure(self, name, action, inputs=(), outputs=()):
+        """
+        returns action wrapped to record its metrics under name when called
+        """
+        def measured_action():
+            rows_in = table_row_counts(inputs)
+            profiler = cProfile.Profile() if name in self.profile_steps else None
+            if self.trace_memory:
+                tracemalloc.reset_peak()
+
+            start_wall = time.perf_counter()
+            # thread cpu time since steps may run on concurrent threads
+            start_cpu = time.thread_time()
+            start_child_cpu = child_cpu_time()
+            if profiler is not None:
+                profiler.enable()
+            try:
+                return action()
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                self.steps[name] = {
+                    "status": "ran",
+                    "wall_time_s": round(time.perf_counter() - start_wall, 4),
+                    "cpu_time_s": round(time.thread_time() - start_cpu, 4),
+                    "child_cpu_time_s": round(child_cpu_time() - start_child_cpu, 4),
+                    # process wide peak so far, concurrent steps share it
+                    "peak_rss_mb": peak_rss_mb(),
+                    "tracemalloc_peak_mb": tracemalloc.get_traced_memory()[1] / BYTES_PER_MB
+                    if self.trace_memory else None,
+                    "rows_in": rows_in,
+                    "rows_out": table_row_counts(outputs),
+                }
+                if profiler is not None:
+                    self.steps[name]["profile_path"] = str(self.save_profile(name, profiler))
+
+        return measured_action
+
+    def measure_tasks(self, tasks):
+        """
+        returns copies of pipeline tasks whose actions record their metrics
+        """
+        return [Task(task.name, self.measure(task.name, task.action, task.inputs, task.outputs),
+                     task.inputs, task.outputs, task.deps) for task in tasks]
+
+    def save_profile(self, name, profiler):
+        """
+        saves the cProfile stats of a step, they can be inspected with pstats or snakeviz
+        """
+        self.metrics_dir.mkdir(parents=True, exist_ok=True)
+        profile_path = self.metrics_dir / f"run_{self.run_id}_{name}.prof"
+        profiler.dump_stats(profile_path)
+        print(f"[{name}] profile saved at: {profile_path}")
+        return profile_path
+
+    def record_skipped(self, names):
+        """
+        records steps that were skipped because their outputs were up to date
+        """
+        for name in names:
+            self.steps.setdefault(name, {"status": "skipped"})
+
+    def to_dict(self):
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_time_s": round(time.perf_counter() - self._start_time, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "steps": self.steps,
+        }
+
+    def write(self):
+        """
+        writes the run's metrics to metrics_dir/run_<run id>.json and returns its path
+        """
+        metrics_path = self.metrics_dir / f"run_{self.run_id}.json"
+        write_json_atomically(self.to_dict(), metrics_path)
+        print(f"\nPipeline metrics saved at: {metrics_path}")
+        return metrics_path
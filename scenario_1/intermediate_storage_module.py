@@ -0,0 +1,154 @@
+import pandas as pd
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+import hashlib
+from pathlib import Path
+from output_writer_module import write_csv, write_parquet
+
+# this module reads and writes the tables exchanged between scenario_1 stages
+# ".parquet" paths store typed columns (datetimes, numbers, dictionary-encoded strings),
+# any other path is treated as a csv export
+
+# placeholder written by the extractors for missing values
+MISSING_VALUE = "NA"
+
+# format used when exporting datetime columns to csv
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def is_parquet_path(path):
+    """
+    checks whether a path should be stored as parquet rather than csv
+    """
+    return Path(path).suffix == ".parquet"
+
+
+def parse_dates(values, date_format=DATE_FORMAT):
+    """
+    parses date strings with a fixed format in one vectorized pass, values that are already datetimes are kept
+    returns the datetime64[ns] series and the number of present values that are not valid dates
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype("datetime64[ns]"), 0
+
+    # the fixed format skips pandas' per-call format inference
+    dates = pd.to_datetime(values, format=date_format, errors="coerce").astype("datetime64[ns]")
+    invalid_count = int((dates.isna() & values.notna()).sum())
+    return dates, invalid_count
+
+
+def parse_numbers(values, dtype):
+    """
+    converts values to numbers of dtype ("Int64" or "float64") in one vectorized pass
+    returns the converted series and the number of present values that are not numbers
+    """
+    values = pd.Series(values)
+    numbers = pd.to_numeric(values, errors="coerce")
+    invalid_count = int((numbers.isna() & values.notna()).sum())
+    return numbers.astype(dtype), invalid_count
+
+
+def apply_typed_schema(df, typed_schema, invalid_counts=None):
+    """
+    converts columns to the dtypes in typed_schema (column name: dtype), treating "NA" placeholders as missing
+    supported dtypes are "Int64", "float64", "datetime64[ns]", "category" and "str"
+    dates are parsed with DATE_FORMAT, if invalid_counts (a dict) is given the number of invalid numbers
+    and dates set to missing is recorded under each numeric and datetime column name
+    """
+    typed_df = pd.DataFrame(index=df.index)
+
+    for column in df.columns:
+        values = df[column].replace(MISSING_VALUE, None)
+        dtype = typed_schema.get(column)
+
+        if dtype in ("Int64", "float64", "datetime64[ns]"):
+            if dtype == "datetime64[ns]":
+                values, invalid_count = parse_dates(values)
+            else:
+                values, invalid_count = parse_numbers(values, dtype)
+            if invalid_counts is not None:
+                invalid_counts[column] = invalid_count
+        elif dtype is not None:
+            values = values.astype(dtype)
+            if dtype == "category":
+                # the "NA" placeholder is no longer a value
+                values = values.cat.remove_unused_categories()
+
+        typed_df[column] = values
+
+    return typed_df
+
+
+def concat_tables(dfs):
+    """
+    concatenates DataFrames with the same columns, categorical columns stay categorical
+    with the union of their categories (pd.concat falls back to strings when categories differ)
+    """
+    dfs = list(dfs)
+    for column in dfs[0].columns:
+        if isinstance(dfs[0][column].dtype, pd.CategoricalDtype):
+            categories = union_categoricals([df[column] for df in dfs]).categories
+            dfs = [df.assign(**{column: df[column].cat.set_categories(categories)}) for df in dfs]
+    return pd.concat(dfs, ignore_index=True)
+
+
+def write_table(df, output_path):
+    """
+    writes df to output_path as parquet or csv depending on the file suffix,
+    the file is written in chunks and only replaces output_path once complete
+    """
+    if is_parquet_path(output_path):
+        write_parquet(df, output_path)
+    else:
+        write_csv(df, output_path)
+
+
+def read_table(input_path, columns=None):
+    """
+    reads a table written by write_table, only loading the requested columns if given
+    """
+    if is_parquet_path(input_path):
+        return pd.read_parquet(input_path, columns=columns)
+    return pd.read_csv(input_path, index_col=None, usecols=columns)
+
+
+def iter_table_chunks(input_path, columns=None, chunk_size=1_000_000):
+    """
+    reads a table written by write_table in DataFrame chunks of up to chunk_size rows,
+    only loading the requested columns if given
+    """
+    if is_parquet_path(input_path):
+        parquet_file = pq.ParquetFile(input_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(input_path, index_col=None, usecols=columns, chunksize=chunk_size)
+
+
+def prepare_csv_export(df):
+    """
+    returns a copy of df ready for csv export, datetimes are formatted as dates
+    and missing values in every column are replaced with "NA"
+    """
+    export_df = df.copy()
+
+    for column in export_df.columns:
+        values = export_df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime(DATE_FORMAT)
+        # typed columns (Int64, category, datetime) cannot hold the "NA" placeholder
+        export_df[column] = values.astype(object)
+
+    return export_df.fillna(MISSING_VALUE)
+
+
+def file_content_hash(file_path, block_size=1 << 20):
+    """
+    returns the sha256 hex digest of a file's content, read in blocks
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
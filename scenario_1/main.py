@@ -1,56 +1,157 @@
 import os
+import argparse
 from pathlib import Path
-from preprocessing_module import restaurant_json_parser, json_to_restaurant_details_csv, json_to_event_details_csv
-from extraction_module_1 import filter_restaurant_details
-from extraction_module_2 import filter_events_by_date
-from analysis_module import analyze_ratings
+from pipeline_module import Task, resolve_tasks, run_tasks
+from instrumentation_module import PipelineMetrics
 
 # run this to run the app for scenario 1
+# each step imports its module (and with it pandas, openpyxl or matplotlib) when it runs,
+# so steps that are skipped or not targeted never load their dependencies
 
 # get base directory
 BASE_DIR = Path(__file__).resolve().parent
 
 RAW_DATA_DIR = BASE_DIR / "raw_data"
 PREPROCESSED_DATA_DIR = BASE_DIR / "preprocessed_data"
+CHECKPOINT_DIR = PREPROCESSED_DATA_DIR / "checkpoints"
+CACHE_DIR = PREPROCESSED_DATA_DIR / "cache"
 OUTPUT_DIR_TASK_1 = BASE_DIR / "output/task_1"
 OUTPUT_DIR_TASK_2 = BASE_DIR / "output/task_2"
 OUTPUT_DIR_TASK_3 = BASE_DIR / "output/task_3"
+METRICS_DIR = BASE_DIR / "metrics"
 
 # file paths
-restaurant_json_path = RAW_DATA_DIR / "restaurants.json"
+# every restaurants*.json page dump is ingested, files are extracted in parallel and merged
+restaurant_json_paths = sorted(RAW_DATA_DIR.glob("restaurants*.json"))
 country_excel_path = RAW_DATA_DIR / "Country-Code.xlsx"
-preprocessed_restaurant_csv = PREPROCESSED_DATA_DIR / \
-    "preprocessed_restaurant_details.csv"
-preprocessed_event_csv = PREPROCESSED_DATA_DIR / "preprocessed_event_data.csv"
+# intermediate tables are stored as typed parquet, final outputs are exported as csv
+preprocessed_restaurant_path = PREPROCESSED_DATA_DIR / \
+    "preprocessed_restaurant_details.parquet"
+preprocessed_event_path = PREPROCESSED_DATA_DIR / "preprocessed_event_data.parquet"
+cuisine_index_path = PREPROCESSED_DATA_DIR / "cuisine_index.npz"
 restaurant_details_output_path = OUTPUT_DIR_TASK_1 / "restaurant_details.csv"
 event_details_output_path = OUTPUT_DIR_TASK_2 / "restaurant_events.csv"
 ratings_pdf_output_path = OUTPUT_DIR_TASK_3 / "ratings_analysis.pdf"
+# optional SQLite database the preprocessing and extraction steps load their tables into
+database_output_path = BASE_DIR / "output" / "scenario_1.sqlite"
 
 
-def main():
-    """
-    runs scenario 1 pipeline
-    """
+def extract_restaurants_and_events(database_path=None):
+    from preprocessing_module import json_files_to_restaurant_and_event_csv
 
     print("\n Step 1: Preprocessing Raw JSON Data \n")
-    raw_data = restaurant_json_parser(restaurant_json_path)
+    # raw json is streamed page by page rather than loaded into memory at once
+    print(f"Streaming pages from {len(restaurant_json_paths)} raw json file(s)")
+
+    # restaurant and event details are extracted in one traversal of the pages
+    print("\n Step 2 & 3: Extracting Restaurant and Event Details \n")
+    # only new or changed raw files are re-extracted, the rest are reused from checkpoints
+    json_files_to_restaurant_and_event_csv(
+        restaurant_json_paths, preprocessed_restaurant_path, preprocessed_event_path,
+        checkpoint_dir=CHECKPOINT_DIR, database_path=database_path)
+
+
+def index_cuisines():
+    from cuisine_index_module import build_cuisine_index
+
+    print("\n Indexing Restaurants by Cuisine and Country \n")
+    build_cuisine_index(preprocessed_restaurant_path, cuisine_index_path)
 
-    print("\n Step 2: Extracting Restaurant Details \n")
-    json_to_restaurant_details_csv(raw_data, preprocessed_restaurant_csv)
 
-    print("\n Step 3: Extracting Event Details \n")
-    json_to_event_details_csv(raw_data, preprocessed_event_csv)
+def filter_restaurants(database_path=None):
+    from extraction_module_1 import filter_restaurant_details
 
     print("\n Step 4: Filtering Restaurant Details with Valid Country Codes \n")
     filter_restaurant_details(
-        preprocessed_restaurant_csv, country_excel_path, restaurant_details_output_path)
+        preprocessed_restaurant_path, country_excel_path, restaurant_details_output_path,
+        country_cache_dir=CACHE_DIR, database_path=database_path)
+
+
+def filter_events(database_path=None):
+    from extraction_module_2 import filter_events_by_date
 
     print("\n Step 5: Filtering Events for April 2019 \n")
-    filter_events_by_date(preprocessed_event_csv,
-                          event_details_output_path, "2019-04-01", "2019-04-30")
+    filter_events_by_date(preprocessed_event_path,
+                          event_details_output_path, "2019-04-01", "2019-04-30", database_path=database_path)
+
+
+def analyze_restaurant_ratings():
+    from analysis_module import analyze_ratings
 
     print("\n Step 6: Performing Rating Analysis \n")
-    analyze_ratings(preprocessed_restaurant_csv, ratings_pdf_output_path)
+    analyze_ratings(preprocessed_restaurant_path, ratings_pdf_output_path)
+
+
+def build_tasks(database_path=None):
+    """
+    declares the pipeline steps with their input and output files, a step's own module is one of its inputs
+    so that code changes re-run it; steps 4, 5 and 6 only depend on the preprocessed tables
+    with database_path, the preprocessing and extraction steps also load their tables into that database
+    """
+    database_outputs = [Path(database_path)] if database_path is not None else []
+    return [
+        Task("preprocess", lambda: extract_restaurants_and_events(database_path),
+             inputs=restaurant_json_paths + [BASE_DIR / "preprocessing_module.py"],
+             outputs=[preprocessed_restaurant_path, preprocessed_event_path] + database_outputs),
+        Task("cuisine_index", index_cuisines,
+             inputs=[preprocessed_restaurant_path, BASE_DIR / "cuisine_index_module.py"],
+             outputs=[cuisine_index_path], deps=["preprocess"]),
+        Task("restaurant_details", lambda: filter_restaurants(database_path),
+             inputs=[preprocessed_restaurant_path, country_excel_path,
+                     BASE_DIR / "extraction_module_1.py"],
+             outputs=[restaurant_details_output_path] + database_outputs, deps=["preprocess"]),
+        Task("restaurant_events", lambda: filter_events(database_path),
+             inputs=[preprocessed_event_path, BASE_DIR / "extraction_module_2.py"],
+             outputs=[event_details_output_path] + database_outputs, deps=["preprocess"]),
+        Task("ratings_analysis", analyze_restaurant_ratings,
+             inputs=[preprocessed_restaurant_path, BASE_DIR / "analysis_module.py"],
+             outputs=[ratings_pdf_output_path], deps=["preprocess"]),
+    ]
+
+
+def main(argv=None):
+    """
+    runs scenario 1 pipeline, or only the given targets and the steps they depend on
+    the time, memory and row counts of every step are saved to a metrics json file per run
+    """
+    task_names = [task.name for task in build_tasks()]
+
+    parser = argparse.ArgumentParser(description="Runs the scenario 1 pipeline.")
+    parser.add_argument("targets", nargs="*",
+                        help=f"steps to run with their dependencies: {', '.join(task_names)} (default: all)")
+    parser.add_argument("--force", action="store_true",
+                        help="re-run steps even if their outputs are up to date")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="maximum number of steps run at the same time")
+    parser.add_argument("--profile", action="append", default=[], choices=task_names, metavar="STEP",
+                        help="save a cProfile of STEP next to the metrics file (can be repeated)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record each step's peak python allocations with tracemalloc, runs steps one at a time")
+    parser.add_argument("--database", nargs="?", const=database_output_path, default=None, metavar="PATH",
+                        help="also load the preprocessed and extracted tables into an SQLite database "
+                             f"(default: {database_output_path.relative_to(BASE_DIR)})")
+    args = parser.parse_args(argv)
+    tasks = build_tasks(args.database)
+    try:
+        # unknown targets and dependency cycles are reported before any step runs,
+        # errors raised by the steps themselves propagate with their traceback
+        resolve_tasks(tasks, args.targets)
+    except ValueError as e:
+        parser.error(str(e))
+
+    metrics = PipelineMetrics(METRICS_DIR, args.profile, args.trace_memory)
+    max_workers = 1 if args.trace_memory else args.jobs
+
+    results = {}
+    try:
+        results = run_tasks(metrics.measure_tasks(tasks), args.targets,
+                            force=args.force, max_workers=max_workers)
+    finally:
+        # metrics of the steps that ran are kept even if a step failed
+        metrics.record_skipped(
+            name for name, status in results.items() if status == "skipped")
+        if metrics.steps:
+            metrics.write()
 
     print("\n Scenario 1 Pipeline Completed")
 
@@ -0,0 +1,115 @@
+import io
+import os
+import gzip
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+# this module writes the tables produced by scenario_1 stages
+# csv files are written in chunks of rows (so the whole text is never held in memory) and optionally
+# compressed with gzip or zstd, every file is written to a temporary file next to the output and renamed
+# into place once complete, so a crash mid-write never leaves a truncated output for the next stage
+
+# rows converted to csv text at a time
+DEFAULT_CHUNK_SIZE = 100_000
+
+# output suffixes that select a compression, matching what pd.read_csv infers when reading them back
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+COMPRESSIONS = [None, "gzip", "zstd"]
+
+
+def infer_compression(output_path):
+    """
+    returns the compression selected by the output path suffix, e.g. "gzip" for "restaurant_details.csv.gz"
+    """
+    return COMPRESSION_SUFFIXES.get(Path(output_path).suffix)
+
+
+@contextmanager
+def atomic_output(output_path):
+    """
+    yields a temporary path to write output_path to, which replaces output_path when the block completes
+    if the block raises, the temporary file is deleted and output_path is left untouched
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    try:
+        yield temp_path
+        os.replace(temp_path, output_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def write_json_atomically(data, output_path):
+    """
+    writes data as json to a temporary file and renames it into place,
+    so readers never see a partially written file
+    """
+    with atomic_output(output_path) as temp_path:
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+
+
+@contextmanager
+def open_compressed(path, compression=None):
+    """
+    opens path for writing bytes, compressed with gzip or zstd if given
+    zstd needs the optional zstandard package
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression {compression!r}, expected one of {COMPRESSIONS}.")
+
+    with open(path, "wb") as file:
+        if compression == "gzip":
+            # level 6 is about twice as fast as the default 9 for a slightly larger file, no file name or
+            # timestamp in the header, so unchanged tables give identical files
+            with gzip.GzipFile(filename="", mode="wb", fileobj=file, compresslevel=6, mtime=0) as gzip_file:
+                yield gzip_file
+        elif compression == "zstd":
+            try:
+                import zstandard
+            except ImportError as e:
+                raise ImportError("zstd compression requires the zstandard package.") from e
+            with zstandard.ZstdCompressor().stream_writer(file, closefd=False) as zstd_file:
+                yield zstd_file
+        else:
+            yield file
+
+
+def write_csv_chunks(chunks, output_path, compression="infer"):
+    """
+    writes an iterable of DataFrames with the same columns to one csv file, the header is taken from the
+    first chunk; compression is "infer" (from the output suffix), None, "gzip" or "zstd"
+    returns the number of rows written
+    """
+    if compression == "infer":
+        compression = infer_compression(output_path)
+
+    row_count = 0
+    with atomic_output(output_path) as temp_path, open_compressed(temp_path, compression) as binary_file:
+        text_file = io.TextIOWrapper(binary_file, encoding="utf-8", newline="")
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(text_file, index=False, header=i == 0)
+            row_count += len(chunk)
+        # flushes the text and leaves the compressed stream open for open_compressed to finish it
+        text_file.detach()
+    return row_count
+
+
+def write_csv(df, output_path, compression="infer", chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    writes df to a csv file chunk_size rows at a time, the file is the same as df.to_csv(index=False)
+    """
+    # an empty DataFrame still writes its header
+    starts = range(0, max(len(df), 1), chunk_size)
+    return write_csv_chunks((df.iloc[start:start + chunk_size] for start in starts), output_path, compression)
+
+
+def write_parquet(df, output_path, compression="snappy", row_group_size=DEFAULT_CHUNK_SIZE * 10):
+    """
+    writes df to a parquet file, compression is any parquet codec ("snappy", "gzip", "zstd" or None)
+    """
+    with atomic_output(output_path) as temp_path:
+        df.to_parquet(temp_path, index=False, compression=compression, row_group_size=row_group_size)
+    return len(df)
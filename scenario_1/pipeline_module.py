@@ -0,0 +1,108 @@
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# this module runs pipeline steps as a task graph, each task declares its input and output files
+# and the tasks it depends on, tasks whose outputs are newer than their inputs are skipped (like make)
+# and tasks whose dependencies have finished run concurrently
+
+
+class Task:
+    """
+    a named pipeline step, action is called without arguments to produce the outputs from the inputs
+    """
+
+    def __init__(self, name, action, inputs=(), outputs=(), deps=()):
+        self.name = name
+        self.action = action
+        self.inputs = [Path(path) for path in inputs]
+        self.outputs = [Path(path) for path in outputs]
+        self.deps = list(deps)
+
+    def __repr__(self):
+        return f"Task({self.name!r})"
+
+
+def is_up_to_date(task):
+    """
+    checks whether every output of a task exists and is at least as new as every input
+    tasks without outputs are never up to date
+    """
+    if not task.outputs or not all(path.exists() for path in task.outputs):
+        return False
+    # a missing input is left for the task itself to report
+    if not all(path.exists() for path in task.inputs):
+        return False
+
+    oldest_output = min(path.stat().st_mtime_ns for path in task.outputs)
+    return all(path.stat().st_mtime_ns <= oldest_output for path in task.inputs)
+
+
+def resolve_tasks(tasks, targets=None):
+    """
+    returns the tasks needed to build the targets (all tasks if none given) with their dependencies,
+    in an order where every task comes after its dependencies
+    """
+    tasks_by_name = {task.name: task for task in tasks}
+    targets = list(tasks_by_name) if not targets else list(targets)
+
+    unknown = [name for name in targets if name not in tasks_by_name]
+    if unknown:
+        raise ValueError(
+            f"Unknown target(s): {', '.join(unknown)}. Available targets: {', '.join(tasks_by_name)}")
+
+    ordered = []
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        if name not in tasks_by_name:
+            raise ValueError(f"Task {path[-1]!r} depends on unknown task {name!r}")
+
+        state[name] = "visiting"
+        for dep in tasks_by_name[name].deps:
+            visit(dep, path + [name])
+        state[name] = "done"
+        ordered.append(tasks_by_name[name])
+
+    for name in targets:
+        visit(name, [])
+
+    return ordered
+
+
+def run_tasks(tasks, targets=None, force=False, max_workers=None):
+    """
+    runs the targets and their dependencies, starting each task as soon as its dependencies finish
+    up to date tasks are skipped unless force=True, a failing task stops its dependents from running
+    returns {task name: "ran" or "skipped"}
+    """
+    pending = resolve_tasks(tasks, targets)
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+
+        while pending or running:
+            # start every task whose dependencies have all finished
+            for task in [task for task in pending if all(dep in results for dep in task.deps)]:
+                pending.remove(task)
+                if not force and is_up_to_date(task):
+                    print(f"[{task.name}] up to date, skipped")
+                    results[task.name] = "skipped"
+                else:
+                    running[executor.submit(task.action)] = task
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                # re-raises the task's exception once already running tasks have finished
+                future.result()
+                results[task.name] = "ran"
+
+    return results
@@ -1,8 +1,16 @@
 import pandas as pd
 import json
+from pandas.api.types import union_categoricals
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from intermediate_storage_module import apply_typed_schema, is_parquet_path, write_table, file_content_hash, \
+    concat_tables
+from output_writer_module import write_json_atomically, atomic_output
+from dedup_module import StreamingDeduplicator
+from sql_store_module import load_table
 
-# this module reads raw json data and writes it to a preprocessed_restaurant_data.csv file
+# this module reads raw json data and writes it to typed preprocessed_restaurant_details.parquet
+# and preprocessed_event_data.parquet files, a ".csv" output path exports the same tables as csv
 
 # get base directory
 BASE_DIR = Path(__file__).resolve().parent
@@ -10,6 +18,7 @@ BASE_DIR = Path(__file__).resolve().parent
 # define input and output directories dynamically
 RAW_DATA_DIR = BASE_DIR / "raw_data"
 PREPROCESSED_DATA_DIR = BASE_DIR / "preprocessed_data"
+CHECKPOINT_DIR = PREPROCESSED_DATA_DIR / "checkpoints"
 
 
 def restaurant_json_parser(restaurant_json_path):
@@ -21,6 +30,96 @@ def restaurant_json_parser(restaurant_json_path):
         return restaurant_data
 
 
+def iter_restaurant_pages(restaurant_json_path, chunk_size=1 << 20):
+    """
+    incrementally parses raw json data and yields one page (top level list item) at a time
+    only the page currently being decoded is held in memory, so peak memory does not grow with file size
+    """
+    decoder = json.JSONDecoder()
+
+    with open(restaurant_json_path, "r", encoding="utf-8") as file:
+        buffer = ""
+        position = 0
+        eof = False
+        read_size = chunk_size
+
+        def fill(min_size=0):
+            # read more text into the buffer, dropping the part that was already decoded
+            nonlocal buffer, position, eof
+            buffer = buffer[position:]
+            position = 0
+            chunk = file.read(max(read_size, min_size))
+            if chunk:
+                buffer += chunk
+            else:
+                eof = True
+
+        def skip_whitespace():
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                fill()
+
+        # expect the file to contain a single top level json list
+        skip_whitespace()
+        if position >= len(buffer):
+            return
+        if buffer[position] != "[":
+            raise ValueError(
+                f"Expected a JSON list in {restaurant_json_path}, found {buffer[position]!r}")
+        position += 1
+
+        expect_separator = False
+        while True:
+            skip_whitespace()
+            if position >= len(buffer):
+                raise ValueError(
+                    f"Unexpected end of file in {restaurant_json_path}")
+
+            character = buffer[position]
+            if character == "]":
+                return
+            if expect_separator:
+                if character != ",":
+                    raise ValueError(
+                        f"Expected ',' or ']' in {restaurant_json_path}, found {character!r}")
+                position += 1
+                expect_separator = False
+                continue
+
+            try:
+                page, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # page spans beyond the buffer, grow reads so large pages are not re-decoded too often
+                fill(len(buffer))
+                read_size *= 2
+                continue
+
+            # a scalar ending exactly at the buffer boundary may continue in the next chunk
+            if end == len(buffer) and not eof and not isinstance(page, (dict, list)):
+                fill()
+                continue
+
+            read_size = chunk_size
+            position = end
+            expect_separator = True
+            yield page
+
+
+def iter_restaurants(restaurant_json_path, chunk_size=1 << 20):
+    """
+    incrementally parses raw json data and yields one restaurant dictionary at a time
+    """
+    for item in iter_restaurant_pages(restaurant_json_path, chunk_size=chunk_size):
+        for entry in item.get("restaurants", []):
+            yield entry.get("restaurant", {})
+
+
 # def inspect_json(data, indent=0):
 #     """
 #     prints JSON structure with key names and value types to understand how to subsequently process
@@ -41,81 +140,196 @@ def restaurant_json_parser(restaurant_json_path):
 # inspect_json(raw_data)
 
 
-def json_to_restaurant_details_csv(raw_data, output_path):
+# declared schema (column name: pandas dtype) of the preprocessed restaurant and event tables
+# ids, codes and ratings can be a number or the "NA" default in the raw json so they are kept as objects,
+# highly repetitive restaurant dimensions are dictionary-encoded as categoricals from extraction onwards
+RESTAURANT_SCHEMA = {
+    "restaurant_id": "object",
+    "restaurant_name": "str",
+    "country": "object",
+    "city": "category",
+    "user_rating_votes": "object",
+    "user_aggregate_rating": "object",
+    "cuisines": "category",
+    "event_date": "str",
+    "rating_text": "category"
+}
+EVENT_SCHEMA = {
+    "event_id": "object",
+    "restaurant_id": "object",
+    "restaurant_name": "str",
+    "photo_url": "str",
+    "event_title": "str",
+    "event_start_date": "str",
+    "event_end_date": "str"
+}
+
+# column types stored in the typed (parquet) preprocessed tables
+TYPED_RESTAURANT_SCHEMA = {
+    "restaurant_id": "Int64",
+    "restaurant_name": "str",
+    "country": "Int64",
+    "city": "category",
+    "user_rating_votes": "Int64",
+    "user_aggregate_rating": "float64",
+    "cuisines": "category",
+    "event_date": "datetime64[ns]",
+    "rating_text": "category"
+}
+TYPED_EVENT_SCHEMA = {
+    "event_id": "Int64",
+    "restaurant_id": "Int64",
+    "restaurant_name": "category",
+    "photo_url": "str",
+    "event_title": "str",
+    "event_start_date": "datetime64[ns]",
+    "event_end_date": "datetime64[ns]"
+}
+
+RESTAURANT_COLUMNS = list(RESTAURANT_SCHEMA)
+EVENT_COLUMNS = list(EVENT_SCHEMA)
+
+# name of the manifest file recording content hashes of already extracted raw json files
+CHECKPOINT_MANIFEST_NAME = "checkpoint_manifest.json"
+# bumped whenever the extracted rows change, checkpoints of other versions are re-extracted
+CHECKPOINT_VERSION = 3
+
+# duplicate events start and end on same day with same event title and restaurant id and name
+EVENT_DEDUP_COLUMNS = [
+    "restaurant_id", "restaurant_name", "event_title", "event_start_date", "event_end_date"
+]
+
+
+class ColumnarBuilder:
     """
-    extracts relevant restaurant detail json fields to "preprocessed_restaurant_data.csv"
+    accumulates rows into typed per-column arrays following a declared schema
+    rows are tuples in schema column order, so no dict is allocated per row and pandas does not
+    have to infer the schema; pending rows are transposed into columns every batch_size rows
+    with a deduplicator (StreamingDeduplicator), duplicate rows are dropped batch by batch
     """
-    extracted_data = []
 
-    for item in raw_data:
-        restaurants = item.get("restaurants", [])
+    def __init__(self, schema, batch_size=65536, deduplicator=None):
+        self.schema = schema
+        self.batch_size = batch_size
+        self.deduplicator = deduplicator
+        self._pending_rows = []
+        self._column_chunks = {column: [] for column in schema}
+        self._row_count = 0
 
-        for entry in restaurants:
-            restaurant = entry.get("restaurant", {})
+    def __len__(self):
+        return self._row_count
 
-            # extract relevant fields and replace missing values with "NA",
-            # add more fields to extract accordingly based on requirements
-            restaurant_id = restaurant.get("R", {}).get("res_id", "NA")
-            restaurant_name = restaurant.get("name", "NA")
-            city = restaurant.get("location", {}).get("city", "NA")
-            country = restaurant.get("location", {}).get("country_id", "NA")
-            user_rating_votes = restaurant.get(
-                "user_rating", {}).get("votes", "NA")
-            user_aggregate_rating = restaurant.get(
-                "user_rating", {}).get("aggregate_rating", "NA")
-            cuisines = restaurant.get("cuisines", "NA")
-            rating_text = restaurant.get(
-                "user_rating", {}).get("rating_text", "NA")
-            # extract date of first event in the list? not sure whether to list all or 1
-            event_date = "NA"
-            events = restaurant.get("zomato_events", [])
-            if events:
-                event_date = events[0].get("event", {}).get("start_date", "NA")
-
-            extracted_data.append({
-                "restaurant_id": restaurant_id,
-                "restaurant_name": restaurant_name,
-                "country": country,
-                "city": city,
-                "user_rating_votes": user_rating_votes,
-                "user_aggregate_rating": user_aggregate_rating,
-                "cuisines": cuisines,
-                "event_date": event_date,
-                "rating_text": rating_text
-            })
-
-    # write extracted data to csv
-    restaurant_df = pd.DataFrame(extracted_data)
-    # drop duplicates, must be identical because restaurant could have updated rating, cuisine, location etc.
-    restaurant_df = restaurant_df.drop_duplicates()
-    restaurant_df.to_csv(output_path, index=False)
-    print(
-        f"\n Data Preview for Restaurant Details \n \n {restaurant_df.head()}")
+    def append(self, row):
+        """
+        adds a row tuple, can be used directly as an extraction sink
+        """
+        self._pending_rows.append(row)
+        self._row_count += 1
+        if len(self._pending_rows) >= self.batch_size:
+            self._flush()
 
+    def _flush(self):
+        """
+        transposes pending rows into one typed array per column
+        """
+        if not self._pending_rows:
+            return
+        batch = {column: pd.array(values, dtype=dtype)
+                 for (column, dtype), values in zip(self.schema.items(), zip(*self._pending_rows))}
+        self._pending_rows = []
+
+        if self.deduplicator is not None:
+            unique = self.deduplicator.unique_mask(pd.DataFrame(batch, copy=False))
+            self._row_count -= len(unique) - unique.sum()
+            batch = {column: values[unique] for column, values in batch.items()}
+
+        for column, values in batch.items():
+            self._column_chunks[column].append(values)
+
+    def to_dataframe(self):
+        """
+        returns the accumulated rows as a DataFrame with the declared column dtypes
+        the deduplicator's spilled fingerprints are deleted, so no rows should be appended afterwards
+        """
+        self._flush()
+        if self.deduplicator is not None:
+            self.deduplicator.close()
+        columns = {}
+        for column, dtype in self.schema.items():
+            chunks = self._column_chunks[column]
+            if not chunks:
+                columns[column] = pd.Series([], dtype=dtype)
+            elif len(chunks) == 1:
+                columns[column] = pd.Series(chunks[0], copy=False)
+            elif dtype == "category":
+                # each batch has its own category dictionary
+                columns[column] = pd.Series(union_categoricals(chunks), copy=False)
+            else:
+                columns[column] = pd.Series(
+                    type(chunks[0])._concat_same_type(chunks), copy=False)
+        return pd.DataFrame(columns, copy=False)
+
+
+def restaurant_deduplicator():
+    """
+    duplicate restaurants must be identical in every column,
+    because a restaurant could have updated rating, cuisine, location etc.
+    """
+    return StreamingDeduplicator()
+
+
+def event_deduplicator():
+    """
+    duplicate events match on EVENT_DEDUP_COLUMNS
+    """
+    return StreamingDeduplicator(key_columns=EVENT_DEDUP_COLUMNS)
 
-def json_to_event_details_csv(raw_data, output_path):
-    """extracts relevant event json fields to preprocessed_event_data.csv"""
-    extracted_data = []
 
+def extract_restaurant_and_event_rows(raw_data, restaurant_sink=None, event_sink=None):
+    """
+    walks every page, restaurant and event of the raw json data once
+    each restaurant row is passed to restaurant_sink and each event row to event_sink as a tuple in
+    RESTAURANT_COLUMNS / EVENT_COLUMNS order, a sink can be any callable taking a row
+    (e.g. ColumnarBuilder.append), None skips that table
+    """
     for item in raw_data:
         restaurants = item.get("restaurants", [])
 
         for entry in restaurants:
             restaurant = entry.get("restaurant", {})
+
+            # fields shared by both tables are looked up once per restaurant
             restaurant_id = restaurant.get("R", {}).get("res_id", "NA")
             restaurant_name = restaurant.get("name", "NA")
-
-            # extract events
             events = restaurant.get("zomato_events", [])
-            # iterate through events and extract relevant info
-            # add more fields based on requirements accordingly
-            if events:
+
+            if restaurant_sink is not None:
+                # extract relevant fields and replace missing values with "NA",
+                # add more fields to extract accordingly based on requirements
+                location = restaurant.get("location", {})
+                user_rating = restaurant.get("user_rating", {})
+                # extract date of first event in the list? not sure whether to list all or 1
+                event_date = "NA"
+                if events:
+                    event_date = events[0].get("event", {}).get("start_date", "NA")
+
+                restaurant_sink((
+                    restaurant_id,
+                    restaurant_name,
+                    location.get("country_id", "NA"),
+                    location.get("city", "NA"),
+                    user_rating.get("votes", "NA"),
+                    user_rating.get("aggregate_rating", "NA"),
+                    restaurant.get("cuisines", "NA"),
+                    event_date,
+                    user_rating.get("rating_text", "NA")
+                ))
+
+            if event_sink is not None:
+                # iterate through events and extract relevant info
+                # add more fields based on requirements accordingly
                 for event_listing in events:
                     event = event_listing.get("event", {})
-                    event_id = event.get("event_id", "NA")
-                    event_title = event.get("title", "NA")
-                    event_start_date = event.get("start_date", "NA")
-                    event_end_date = event.get("end_date", "NA")
 
                     # assume that only first photo URL is taken
                     photo_url = "NA"
@@ -123,38 +337,276 @@ def json_to_event_details_csv(raw_data, output_path):
                     if photos:
                         photo_url = photos[0].get("photo", {}).get("url", "NA")
 
-                    extracted_data.append({
-                        "event_id": event_id,
-                        "restaurant_id": restaurant_id,
-                        "restaurant_name": restaurant_name,
-                        "photo_url": photo_url,
-                        "event_title": event_title,
-                        "event_start_date": event_start_date,
-                        "event_end_date": event_end_date
-                    })
-
-    # write extracted event data to csv
-    event_df = pd.DataFrame(extracted_data)
-    # drop duplicate events (start and end on same day with same event title and restaurant id and name)
-    event_df = event_df.drop_duplicates(
-        subset=["restaurant_id", "restaurant_name", "event_title", "event_start_date", "event_end_date"])
-    event_df.to_csv(output_path, index=False)
+                    event_sink((
+                        event.get("event_id", "NA"),
+                        restaurant_id,
+                        restaurant_name,
+                        photo_url,
+                        event.get("title", "NA"),
+                        event.get("start_date", "NA"),
+                        event.get("end_date", "NA")
+                    ))
+
+
+def typed_table(df, typed_schema):
+    """
+    applies typed_schema to extracted rows, dates are parsed here once so later stages read datetime64 columns
+    present values that are not numbers (e.g. a non-numeric restaurant id or country code) or not YYYY-MM-DD
+    dates are stored as missing and counted
+    """
+    invalid_counts = {}
+    typed_df = apply_typed_schema(df, typed_schema, invalid_counts)
+    for column, invalid_count in invalid_counts.items():
+        if invalid_count:
+            print(f"Warning: {invalid_count} invalid {column} value(s) stored as missing")
+    return typed_df
+
+
+def save_restaurant_details(restaurant_df, output_path, database_path=None):
+    """
+    writes deduplicated restaurant rows to output_path
+    parquet output is stored with TYPED_RESTAURANT_SCHEMA, csv output keeps the raw values
+    if database_path is given the typed rows are also loaded into its restaurants table
+    """
+    typed_df = None
+    if is_parquet_path(output_path) or database_path is not None:
+        typed_df = typed_table(restaurant_df, TYPED_RESTAURANT_SCHEMA)
+    if is_parquet_path(output_path):
+        restaurant_df = typed_df
+    write_table(restaurant_df, output_path)
+    if database_path is not None:
+        load_table(database_path, "restaurants", typed_df)
+    print(
+        f"\n Data Preview for Restaurant Details \n \n {restaurant_df.head()}")
+
+
+def save_event_details(event_df, output_path, database_path=None):
+    """
+    writes deduplicated event rows to output_path
+    parquet output is stored with TYPED_EVENT_SCHEMA, csv output keeps the raw values
+    if database_path is given the typed rows are also loaded into its events table
+    """
+    typed_df = None
+    if is_parquet_path(output_path) or database_path is not None:
+        typed_df = typed_table(event_df, TYPED_EVENT_SCHEMA)
+    if is_parquet_path(output_path):
+        event_df = typed_df
+    write_table(event_df, output_path)
+    if database_path is not None:
+        load_table(database_path, "events", typed_df)
     print(f"\n Data Preview for Event Details: \n \n {event_df.head()}")
 
 
+def json_to_restaurant_details_csv(raw_data, output_path):
+    """
+    extracts relevant restaurant detail json fields to "preprocessed_restaurant_data.csv"
+    raw_data can be the parsed json list or a page generator from iter_restaurant_pages
+    """
+    # duplicates are dropped batch by batch while rows are extracted, keeping the first occurrence
+    restaurant_builder = ColumnarBuilder(RESTAURANT_SCHEMA, deduplicator=restaurant_deduplicator())
+    extract_restaurant_and_event_rows(
+        raw_data, restaurant_sink=restaurant_builder.append)
+    save_restaurant_details(restaurant_builder.to_dataframe(), output_path)
+
+
+def json_to_event_details_csv(raw_data, output_path):
+    """
+    extracts relevant event json fields to preprocessed_event_data.csv
+    raw_data can be the parsed json list or a page generator from iter_restaurant_pages
+    """
+    event_builder = ColumnarBuilder(EVENT_SCHEMA, deduplicator=event_deduplicator())
+    extract_restaurant_and_event_rows(
+        raw_data, event_sink=event_builder.append)
+    save_event_details(event_builder.to_dataframe(), output_path)
+
+
+def json_to_restaurant_and_event_csv(raw_data, restaurant_output_path, event_output_path):
+    """
+    extracts restaurant details and event details in a single pass over raw_data
+    writes the same outputs as json_to_restaurant_details_csv and json_to_event_details_csv
+    """
+    restaurant_builder = ColumnarBuilder(RESTAURANT_SCHEMA, deduplicator=restaurant_deduplicator())
+    event_builder = ColumnarBuilder(EVENT_SCHEMA, deduplicator=event_deduplicator())
+    extract_restaurant_and_event_rows(
+        raw_data, restaurant_sink=restaurant_builder.append, event_sink=event_builder.append)
+
+    save_restaurant_details(
+        restaurant_builder.to_dataframe(), restaurant_output_path)
+    save_event_details(event_builder.to_dataframe(), event_output_path)
+
+
+def extract_restaurant_and_event_tables(restaurant_json_path):
+    """
+    extracts the restaurant and event tables of a single raw json file, deduplicated within the file
+    used as the per-shard worker of json_files_to_restaurant_and_event_csv
+    """
+    # dropping duplicates within a shard first keeps the first occurrence, so dropping them again
+    # across shards in file order gives the same result as deduplicating all rows at once
+    restaurant_builder = ColumnarBuilder(RESTAURANT_SCHEMA, deduplicator=restaurant_deduplicator())
+    event_builder = ColumnarBuilder(EVENT_SCHEMA, deduplicator=event_deduplicator())
+    extract_restaurant_and_event_rows(iter_restaurant_pages(
+        restaurant_json_path), restaurant_sink=restaurant_builder.append, event_sink=event_builder.append)
+    return restaurant_builder.to_dataframe(), event_builder.to_dataframe()
+
+
+def load_checkpoint_manifest(checkpoint_dir):
+    """
+    loads the checkpoint manifest of checkpoint_dir, returns an empty manifest if there is none
+    the manifest maps each raw json path to its content hash and the extracted rows it produced
+    """
+    manifest_path = Path(checkpoint_dir) / CHECKPOINT_MANIFEST_NAME
+    if not manifest_path.exists():
+        return {"version": CHECKPOINT_VERSION, "files": {}}
+    with open(manifest_path, "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+    if manifest.get("version") != CHECKPOINT_VERSION:
+        return {"version": CHECKPOINT_VERSION, "files": {}}
+    return manifest
+
+
+def save_checkpoint_manifest(checkpoint_dir, manifest):
+    """
+    writes the checkpoint manifest, replacing the previous one only once fully written
+    """
+    write_json_atomically(manifest, Path(
+        checkpoint_dir) / CHECKPOINT_MANIFEST_NAME)
+
+
+def load_checkpointed_tables(checkpoint_dir, entry):
+    """
+    loads the restaurant and event rows recorded for a raw json file in the manifest,
+    returns None if the checkpoint files are missing
+    """
+    restaurant_rows_path = Path(checkpoint_dir) / entry["restaurant_rows"]
+    event_rows_path = Path(checkpoint_dir) / entry["event_rows"]
+    if not (restaurant_rows_path.exists() and event_rows_path.exists()):
+        return None
+    return pd.read_pickle(restaurant_rows_path), pd.read_pickle(event_rows_path)
+
+
+def save_checkpointed_tables(checkpoint_dir, content_hash, restaurant_df, event_df):
+    """
+    stores the rows extracted from a raw json file under its content hash,
+    rows are pickled so raw values (numbers mixed with "NA") dedup exactly as on the first run
+    """
+    entry = {
+        "sha256": content_hash,
+        "restaurant_rows": f"{content_hash}_restaurants.pkl",
+        "event_rows": f"{content_hash}_events.pkl",
+        "restaurant_row_count": len(restaurant_df),
+        "event_row_count": len(event_df)
+    }
+    # written atomically, so an interrupted run never leaves a truncated checkpoint behind
+    for df, rows_name in ((restaurant_df, entry["restaurant_rows"]), (event_df, entry["event_rows"])):
+        with atomic_output(Path(checkpoint_dir) / rows_name) as temp_path:
+            df.to_pickle(temp_path, compression=None)
+    return entry
+
+
+def remove_unreferenced_checkpoints(checkpoint_dir, manifest):
+    """
+    deletes stored rows of file contents that are no longer recorded in the manifest
+    """
+    referenced = {name for entry in manifest["files"].values()
+                  for name in (entry["restaurant_rows"], entry["event_rows"])}
+    for rows_path in Path(checkpoint_dir).glob("*.pkl"):
+        if rows_path.name not in referenced:
+            rows_path.unlink()
+
+
+def json_files_to_restaurant_and_event_csv(restaurant_json_paths, restaurant_output_path, event_output_path,
+                                           max_workers=None, checkpoint_dir=None, database_path=None):
+    """
+    extracts restaurant and event details from many raw json files (shards) in a process pool
+    shards are merged in sorted path order before deduplicating, so the first occurrence of a
+    duplicate is kept exactly as if the files had been concatenated and processed in one pass
+
+    if checkpoint_dir is given, the rows extracted from each file are stored under the file's content hash
+    and later runs only extract new or changed files, reusing the stored rows for the rest
+    if database_path is given the tables are also loaded into that SQLite database (see sql_store_module)
+    """
+    restaurant_json_paths = sorted(restaurant_json_paths)
+    if not restaurant_json_paths:
+        # later steps still find both tables, with no rows
+        print("No raw json files found. Writing empty restaurant and event tables.")
+        save_restaurant_details(ColumnarBuilder(RESTAURANT_SCHEMA).to_dataframe(),
+                                restaurant_output_path, database_path)
+        save_event_details(ColumnarBuilder(EVENT_SCHEMA).to_dataframe(), event_output_path, database_path)
+        return
+
+    shard_tables = {}
+    content_hashes = {}
+    manifest = None
+    if checkpoint_dir is not None:
+        Path(checkpoint_dir).mkdir(parents=True, exist_ok=True)
+        manifest = load_checkpoint_manifest(checkpoint_dir)
+        # forget raw files that no longer exist, so their stored rows are removed below
+        current_paths = {str(path) for path in restaurant_json_paths}
+        manifest["files"] = {path: entry for path, entry in manifest["files"].items() if path in current_paths}
+
+        # reuse rows of files whose content hash has not changed since they were last extracted
+        for path in restaurant_json_paths:
+            content_hashes[path] = file_content_hash(path)
+            entry = manifest["files"].get(str(path))
+            if entry and entry["sha256"] == content_hashes[path]:
+                tables = load_checkpointed_tables(checkpoint_dir, entry)
+                if tables is not None:
+                    shard_tables[path] = tables
+
+    pending_paths = [
+        path for path in restaurant_json_paths if path not in shard_tables]
+
+    if len(pending_paths) <= 1 or max_workers == 1:
+        extracted_tables = list(
+            map(extract_restaurant_and_event_tables, pending_paths))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # map returns results in input order regardless of which worker finishes first
+            extracted_tables = list(executor.map(
+                extract_restaurant_and_event_tables, pending_paths))
+
+    for path, (restaurant_df, event_df) in zip(pending_paths, extracted_tables):
+        shard_tables[path] = (restaurant_df, event_df)
+        if manifest is not None:
+            manifest["files"][str(path)] = save_checkpointed_tables(
+                checkpoint_dir, content_hashes[path], restaurant_df, event_df)
+
+    if manifest is not None:
+        save_checkpoint_manifest(checkpoint_dir, manifest)
+        remove_unreferenced_checkpoints(checkpoint_dir, manifest)
+
+    print(
+        f"Extracted {len(pending_paths)} raw json file(s), "
+        f"reused {len(restaurant_json_paths) - len(pending_paths)} checkpointed file(s)")
+
+    # rows repeated across shards are dropped shard by shard, so only the unique rows are concatenated,
+    # a single shard is already deduplicated
+    restaurant_dfs, event_dfs = zip(
+        *(shard_tables[path] for path in restaurant_json_paths))
+    if len(restaurant_json_paths) > 1:
+        with restaurant_deduplicator() as restaurant_dedup, event_deduplicator() as event_dedup:
+            restaurant_dfs = [restaurant_dedup.drop_duplicates(df) for df in restaurant_dfs]
+            event_dfs = [event_dedup.drop_duplicates(df) for df in event_dfs]
+
+    save_restaurant_details(concat_tables(restaurant_dfs), restaurant_output_path, database_path)
+    save_event_details(concat_tables(event_dfs), event_output_path, database_path)
+
+
 def main():
     """
     runs preprocessing module standalone
     """
-    restaurant_json_path = RAW_DATA_DIR / "restaurants.json"
-    raw_data = restaurant_json_parser(restaurant_json_path)
+    # every restaurants*.json page dump in raw_data is ingested as a shard
+    restaurant_json_paths = sorted(RAW_DATA_DIR.glob("restaurants*.json"))
 
     restaurant_details_output_path = PREPROCESSED_DATA_DIR / \
-        "preprocessed_restaurant_details.csv"
-    json_to_restaurant_details_csv(raw_data, restaurant_details_output_path)
+        "preprocessed_restaurant_details.parquet"
+    event_details_output_path = PREPROCESSED_DATA_DIR / "preprocessed_event_data.parquet"
 
-    event_details_output_path = PREPROCESSED_DATA_DIR / "preprocessed_event_data.csv"
-    json_to_event_details_csv(raw_data, event_details_output_path)
+    # stream pages from each new or changed raw file and extract both tables in a single pass per file
+    json_files_to_restaurant_and_event_csv(
+        restaurant_json_paths, restaurant_details_output_path, event_details_output_path,
+        checkpoint_dir=CHECKPOINT_DIR)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,181 @@
+import numpy as np
+
+# this module summarises aggregate ratings in fixed-bin histogram sketches,
+# sketches are updated chunk by chunk and merged across shards in bounded memory
+
+
+def weighted_gaussian_kde(unique_values, value_counts, variance, coords):
+    """
+    gaussian kernel density estimate (scott's bandwidth, as used by Axes.violinplot) of data given as
+    distinct values and their counts, the kernel is summed once per distinct value instead of once per rating
+    """
+    count = value_counts.sum()
+    covariance = variance * count ** (-2 / 5)
+    norm_factor = np.sqrt(2 * np.pi * covariance) * count
+    energy = (coords[:, np.newaxis] - unique_values) ** 2 / (2 * covariance)
+    return (np.exp(-energy) * value_counts).sum(axis=1) / norm_factor
+
+
+class RatingSketch:
+    """
+    mergeable fixed-bin histogram of ratings between low and high
+    ratings are rounded to the nearest multiple of bin_width, so with the default 0.01 bins the
+    one-decimal zomato ratings are represented exactly; count, sum and min/max are tracked exactly
+    """
+
+    def __init__(self, low=0.0, high=5.0, bin_width=0.01):
+        self.low = low
+        self.high = high
+        self.bin_width = bin_width
+        self.bin_counts = np.zeros(
+            int(round((high - low) / bin_width)) + 1, dtype=np.int64)
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    @property
+    def count(self):
+        return int(self.bin_counts.sum())
+
+    @property
+    def bin_values(self):
+        # rounded so bin values compare equal to the ratings they represent
+        return np.round(self.low + np.arange(len(self.bin_counts)) * self.bin_width, 10)
+
+    def update(self, values):
+        """
+        adds an array of ratings to the sketch, ratings outside [low, high] are counted in the edge bins
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        bins = np.clip(np.rint((values - self.low) / self.bin_width),
+                       0, len(self.bin_counts) - 1).astype(np.intp)
+        self.bin_counts += np.bincount(bins, minlength=len(self.bin_counts))
+        self.total += values.sum()
+        self.total_squares += np.square(values).sum()
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        return self
+
+    def merge(self, other):
+        """
+        adds the counts of another sketch with the same bins to this sketch
+        """
+        if (self.low, self.high, self.bin_width) != (other.low, other.high, other.bin_width):
+            raise ValueError("Only sketches with the same bins can be merged.")
+        self.bin_counts += other.bin_counts
+        self.total += other.total
+        self.total_squares += other.total_squares
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def std(self):
+        """
+        sample standard deviation (ddof=1) like DataFrame.describe()
+        """
+        count = self.count
+        if count < 2:
+            return np.nan
+        variance = (self.total_squares - self.total ** 2 / count) / (count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def quantiles(self, qs):
+        """
+        returns the quantiles qs (between 0 and 1) with numpy's default linear interpolation
+        """
+        count = self.count
+        if count == 0:
+            return np.full(len(qs), np.nan)
+
+        cumulative = np.cumsum(self.bin_counts)
+        bin_values = self.bin_values
+        positions = np.asarray(qs, dtype=float) * (count - 1)
+        lower_ranks = np.floor(positions).astype(np.int64)
+        upper_ranks = np.ceil(positions).astype(np.int64)
+        lower = bin_values[np.searchsorted(cumulative, lower_ranks, side="right")]
+        upper = bin_values[np.searchsorted(cumulative, upper_ranks, side="right")]
+        return lower + (upper - lower) * (positions - lower_ranks)
+
+    def describe(self):
+        """
+        returns [count, mean, std, min, 25%, 50%, 75%, max] like DataFrame.describe()
+        """
+        if self.count == 0:
+            return [0.0] + [np.nan] * 7
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        return [float(self.count), self.mean(), self.std(), self.minimum, q1, median, q3, self.maximum]
+
+    def occupied_bins(self):
+        """
+        returns the values and counts of non-empty bins
+        """
+        occupied = self.bin_counts > 0
+        return self.bin_values[occupied], self.bin_counts[occupied]
+
+    def histogram(self, bins=20):
+        """
+        histogram of the sketched ratings between their minimum and maximum, like np.histogram
+        """
+        values, counts = self.occupied_bins()
+        if self.count == 0:
+            return np.histogram([], bins=bins)
+        return np.histogram(values, bins=bins, range=(self.minimum, self.maximum), weights=counts)
+
+    def box_stats(self, label, whis=1.5):
+        """
+        box plot statistics for Axes.bxp, same definitions as matplotlib.cbook.boxplot_stats
+        """
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        values, _ = self.occupied_bins()
+
+        within = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+        whislo = within.min() if len(within) else q1
+        whishi = within.max() if len(within) else q3
+        notch = 1.57 * iqr / np.sqrt(self.count) if self.count else np.nan
+
+        return {
+            "label": label,
+            "mean": self.mean(),
+            "iqr": iqr,
+            "cilo": median - notch,
+            "cihi": median + notch,
+            "whislo": whislo,
+            "whishi": whishi,
+            # each distinct outlying rating is drawn once
+            "fliers": values[(values < whislo) | (values > whishi)],
+            "q1": q1,
+            "med": median,
+            "q3": q3
+        }
+
+    def violin_stats(self, points=100):
+        """
+        violin statistics for Axes.violin, the density is estimated from the bin counts
+        """
+        values, counts = self.occupied_bins()
+        coords = np.linspace(self.minimum, self.maximum, points)
+        if len(values) == 1:
+            # a single distinct value has no spread to estimate a density from
+            density = (values[0] == coords).astype(float)
+        else:
+            density = weighted_gaussian_kde(
+                values, counts, self.std() ** 2, coords)
+
+        return {
+            "coords": coords,
+            "vals": density,
+            "mean": self.mean(),
+            "median": self.quantiles([0.5])[0],
+            "min": self.minimum,
+            "max": self.maximum,
+            "quantiles": np.array([])
+        }
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from intermediate_storage_module import read_table
+
+# this module loads the extracted restaurant details into an in-process store for repeated queries
+# restaurants are indexed by restaurant_id and (country, city) with hash maps and by
+# user_aggregate_rating with a sorted array, so lookups do not scan the table
+
+# get base directory
+BASE_DIR = Path(__file__).resolve().parent
+
+OUTPUT_DATA_DIR = BASE_DIR / "output/task_1"
+
+
+class RestaurantStore:
+    """
+    restaurant details held as column arrays with indexes for lookups, rating ranges and top-k queries
+    query results are lists of row dictionaries, restaurants listed more than once (e.g. after a rating
+    update) are returned once per row
+    """
+
+    def __init__(self, restaurant_df):
+        restaurant_df = restaurant_df.reset_index(drop=True)
+        self.columns = list(restaurant_df.columns)
+        self._column_values = {column: restaurant_df[column].to_numpy(dtype=object)
+                               for column in self.columns}
+
+        # hash indexes from key to row positions, in table order
+        self._id_index = restaurant_df.groupby("restaurant_id", sort=False).indices
+        self._location_index = restaurant_df.groupby(["country", "city"], sort=False, observed=True).indices
+
+        # rated rows sorted by rating, ties keep table order
+        ratings = pd.to_numeric(restaurant_df["user_aggregate_rating"], errors="coerce").to_numpy(dtype=float)
+        rated_positions = np.flatnonzero(~np.isnan(ratings))
+        order = np.argsort(ratings[rated_positions], kind="stable")
+        self._ratings = ratings
+        self._rating_positions = rated_positions[order]
+        self._sorted_ratings = ratings[self._rating_positions]
+        # rated rows highest rating first, ties keep table order as in top_k of a city
+        self._top_positions = rated_positions[np.argsort(-ratings[rated_positions], kind="stable")]
+
+    def __len__(self):
+        return len(self._ratings)
+
+    @classmethod
+    def load(cls, restaurant_details_path):
+        """
+        loads a store from the restaurant details written by extraction module 1 ("NA" is read as missing)
+        """
+        return cls(read_table(restaurant_details_path))
+
+    def _records(self, positions):
+        """
+        returns the rows at positions as dictionaries
+        """
+        columns = [self._column_values[column][positions].tolist() for column in self.columns]
+        return [dict(zip(self.columns, values)) for values in zip(*columns)]
+
+    def lookup(self, restaurant_id):
+        """
+        returns the rows of a restaurant, empty if it is not in the store
+        """
+        positions = self._id_index.get(restaurant_id)
+        return [] if positions is None else self._records(positions)
+
+    def in_city(self, country, city):
+        """
+        returns the restaurants of a city, country is the country name as in restaurant_details.csv
+        """
+        positions = self._location_index.get((country, city))
+        return [] if positions is None else self._records(positions)
+
+    def rating_range(self, low, high):
+        """
+        returns restaurants rated between low and high (inclusive), lowest rated first
+        """
+        start = np.searchsorted(self._sorted_ratings, low, side="left")
+        end = np.searchsorted(self._sorted_ratings, high, side="right")
+        return self._records(self._rating_positions[start:end])
+
+    def top_k(self, k, country=None, city=None):
+        """
+        returns the k highest rated restaurants, in a city if country and city are given,
+        restaurants with the same rating are returned in table order
+        """
+        if country is None and city is None:
+            return self._records(self._top_positions[:k])
+        if country is None or city is None:
+            raise ValueError("top_k needs both country and city to rank the restaurants of a city")
+
+        positions = self._location_index.get((country, city))
+        if positions is None:
+            return []
+        ratings = self._ratings[positions]
+        rated = positions[~np.isnan(ratings)]
+        # highest ratings first, ties keep table order
+        order = np.argsort(-self._ratings[rated], kind="stable")[:k]
+        return self._records(rated[order])
+
+
+def main():
+    """
+    runs restaurant store module standalone
+    """
+    restaurant_details_path = OUTPUT_DATA_DIR / "restaurant_details.csv"
+
+    store = RestaurantStore.load(restaurant_details_path)
+    print(f"\n Loaded {len(store)} restaurants")
+    print(f"\n Top Rated Restaurants \n \n {pd.DataFrame(store.top_k(5))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import sqlite3
+from pathlib import Path
+import pandas as pd
+
+# this module loads the scenario_1 tables into an optional SQLite database (sqlite3 from the standard library)
+# so ad-hoc questions can be answered with SQL instead of re-reading the csv outputs,
+# tables are bulk loaded with batched inserts in one transaction and indexed once loaded
+
+# get base directory
+BASE_DIR = Path(__file__).resolve().parent
+
+DATABASE_PATH = BASE_DIR / "output" / "scenario_1.sqlite"
+
+# preprocessing loads the full restaurants and events tables, the extraction steps load their outputs
+TABLE_INDEXES = {
+    "restaurants": ["restaurant_id", "country"],
+    "events": ["restaurant_id", "event_start_date", "event_end_date"],
+    "restaurant_details": ["restaurant_id", "country"],
+    "restaurant_events": ["restaurant_id", "event_start_date", "event_end_date"],
+}
+
+# rows passed to each executemany call
+INSERT_BATCH_SIZE = 50_000
+
+# dates are stored as ISO text, which sorts in date order and works with SQLite's date functions
+SQL_DATE_FORMAT = "%Y-%m-%d"
+
+
+def connect(database_path=DATABASE_PATH):
+    """
+    opens the database in autocommit mode so loads control their own transactions,
+    steps loading at the same time wait for each other's writes and readers are not blocked by them (WAL)
+    """
+    Path(database_path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(database_path, timeout=60, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    return connection
+
+
+def sql_type(dtype):
+    """
+    returns the SQLite column type of a pandas dtype
+    """
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def sql_columns(df):
+    """
+    returns the columns of df as lists of python values for sqlite3, missing values become None
+    """
+    columns = []
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            values = values.dt.strftime(SQL_DATE_FORMAT)
+        values = values.astype(object)
+        columns.append(values.where(values.notna(), None).tolist())
+    return columns
+
+
+class TableLoader:
+    """
+    bulk loads DataFrames appended in chunks into a database table, replacing the table once complete
+    rows are inserted into a staging table one transaction per batch (so loads of other tables can
+    interleave), on close the staging table replaces the table and TABLE_INDEXES are created in one
+    transaction, so readers never see a partially loaded table
+    the column types are taken from the dtypes of the first appended DataFrame
+    """
+
+    def __init__(self, database_path, table_name, batch_size=INSERT_BATCH_SIZE):
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.row_count = 0
+        self._staging_name = f"{table_name}__loading"
+        self._columns = None
+        self._connection = connect(database_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            # the table keeps its previous rows
+            if self._connection.in_transaction:
+                self._connection.rollback()
+            self._connection.execute(f'DROP TABLE IF EXISTS "{self._staging_name}"')
+            self._connection.close()
+
+    def append(self, df):
+        """
+        inserts the rows of df, batch_size rows per executemany call
+        """
+        if self._columns is None:
+            self._columns = list(df.columns)
+            column_definitions = ", ".join(f'"{column}" {sql_type(df[column].dtype)}' for column in df.columns)
+            self._connection.execute(f'DROP TABLE IF EXISTS "{self._staging_name}"')
+            self._connection.execute(f'CREATE TABLE "{self._staging_name}" ({column_definitions})')
+
+        insert = (f'INSERT INTO "{self._staging_name}" VALUES '
+                  f'({", ".join("?" for _ in self._columns)})')
+        for start in range(0, len(df), self.batch_size):
+            batch = df.iloc[start:start + self.batch_size]
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.executemany(insert, zip(*sql_columns(batch[self._columns])))
+            self._connection.execute("COMMIT")
+        self.row_count += len(df)
+
+    def close(self):
+        """
+        replaces the table with the loaded rows, indexes it and commits
+        if nothing was appended the table is left unchanged
+        """
+        if self._columns is not None:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.execute(f'DROP TABLE IF EXISTS "{self.table_name}"')
+            self._connection.execute(f'ALTER TABLE "{self._staging_name}" RENAME TO "{self.table_name}"')
+            for column in TABLE_INDEXES.get(self.table_name, []):
+                if column in self._columns:
+                    self._connection.execute(
+                        f'CREATE INDEX "idx_{self.table_name}_{column}" ON "{self.table_name}" ("{column}")')
+            self._connection.execute("COMMIT")
+            print(f"Loaded {self.row_count} rows into the {self.table_name} table")
+        self._connection.close()
+
+
+def load_table(database_path, table_name, df):
+    """
+    replaces a database table with the rows of df
+    """
+    with TableLoader(database_path, table_name) as loader:
+        loader.append(df)
+
+
+def events_per_restaurant(database_path=DATABASE_PATH, start_date=None, end_date=None):
+    """
+    counts the events of each restaurant per country, most events first within each country,
+    only events overlapping [start_date, end_date] are counted if given (e.g. "2019-04-01", "2019-04-30"),
+    events missing the compared date are then left out so the event date indexes can be used
+    """
+    conditions = []
+    parameters = []
+    if start_date is not None:
+        conditions.append("e.event_end_date >= ?")
+        parameters.append(pd.Timestamp(start_date).strftime(SQL_DATE_FORMAT))
+    if end_date is not None:
+        conditions.append("e.event_start_date <= ?")
+        parameters.append(pd.Timestamp(end_date).strftime(SQL_DATE_FORMAT))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    # restaurants listed more than once (e.g. after a rating update) are counted once
+    query = f"""
+        SELECT d.country, e.restaurant_id, d.restaurant_name, COUNT(*) AS events
+        FROM events AS e
+        JOIN (SELECT DISTINCT restaurant_id, restaurant_name, country FROM restaurant_details) AS d
+            ON d.restaurant_id = e.restaurant_id
+        {where}
+        GROUP BY d.country, e.restaurant_id, d.restaurant_name
+        ORDER BY d.country, events DESC, e.restaurant_id
+    """
+    connection = connect(database_path)
+    try:
+        return pd.read_sql_query(query, connection, params=parameters)
+    finally:
+        connection.close()
+
+
+def main():
+    """
+    runs sql store module standalone, prints the restaurants with the most events in each country
+    """
+    if not DATABASE_PATH.exists():
+        print(f"Error: {DATABASE_PATH} not found. Run main.py with --database first.")
+        return
+
+    result = events_per_restaurant(DATABASE_PATH)
+    print(f"\n Events per Restaurant per Country \n \n {result.groupby('country').head(3)}")
+
+
+if __name__ == "__main__":
+    main()
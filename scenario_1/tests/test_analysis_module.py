@@ -2,7 +2,9 @@ import pytest
 import pandas as pd
 from pathlib import Path
 import matplotlib as plt
-from scenario_1.analysis_module import analyze_ratings
+from scenario_1.analysis_module import analyze_ratings, prepare_ratings, compute_rating_statistics, analyze_ratings_by_partition, \
+    partition_file_names, sketch_ratings, merge_rating_sketches, sketch_rating_statistics, analyze_ratings_approximate
+import numpy as np
 
 TEST_DATA_DIR = Path(__file__).resolve().parent / "test_data"
 
@@ -51,3 +53,119 @@ def test_analyze_ratings(tmp_path, sample_ratings_csv):
     df["rating_text"].value_counts().plot(kind="bar", ax=ax)
     assert len(ax.patches) == len(df["rating_text"].unique(
     )), "Bar plot does not match unique rating texts"
+
+
+def test_compute_rating_statistics_matches_describe():
+    """
+    test the single aggregation pass gives the same summary as groupby describe
+    """
+    df = prepare_ratings(pd.DataFrame({
+        "rating_text": ["Poor", "Average", "Average", "Muy Bueno", "Very Good", "Not rated", "Excellent"],
+        "user_aggregate_rating": [2.5, 3.2, 3.4, 4.1, 4.3, 0, "NA"]
+    }))
+    stats = compute_rating_statistics(df)
+
+    expected = df.groupby("rating_text", observed=False)[
+        "user_aggregate_rating"].describe()
+    pd.testing.assert_frame_equal(stats["summary"], expected, check_index_type=False)
+    assert stats["counts"].tolist() == [1, 2, 0, 2, 0]
+    assert stats["histogram"][0].sum() == len(df)
+    assert stats["violin_positions"] == [1, 2, 4]
+
+
+def test_prepare_ratings_translates_categorical_rating_text():
+    """
+    test categorical rating texts are translated like plain strings, with "Not rated" rows dropped
+    """
+    ratings_df = pd.DataFrame({
+        "rating_text": ["Muy Bueno", "Not rated", "Excelente", "Average", "Unknown", "Muy Bueno"],
+        "user_aggregate_rating": [4.1, 0, 4.7, 3.1, 3.5, 4.2]
+    })
+
+    expected = prepare_ratings(ratings_df.astype({"rating_text": object}))
+    prepared = prepare_ratings(ratings_df.astype({"rating_text": "category"}))
+
+    pd.testing.assert_frame_equal(prepared, expected)
+    assert prepared["rating_text"].tolist()[:3] == ["Very Good", "Excellent", "Average"]
+    assert pd.isna(prepared["rating_text"].iloc[3])
+
+
+def test_analyze_ratings_by_partition(tmp_path):
+    """
+    test one report is rendered per partition value in worker processes
+    """
+    input_path = tmp_path / "ratings_data.csv"
+    partitioned_df = pd.concat([SAMPLE_RATINGS_DF.assign(country="India"),
+                                SAMPLE_RATINGS_DF.assign(country="New Zealand")])
+    partitioned_df.to_csv(input_path, index=False)
+
+    report_paths = analyze_ratings_by_partition(
+        input_path, tmp_path / "reports", partition_column="country", max_workers=2)
+
+    assert sorted(report_paths) == ["India", "New Zealand"]
+    assert report_paths["New Zealand"].name == "ratings_analysis_country=New_Zealand.pdf"
+    assert all(path.exists() and path.stat().st_size > 0 for path in report_paths.values())
+
+
+def test_analyze_ratings_by_partition_keeps_colliding_names_apart(tmp_path):
+    """
+    test partition values that sanitize to the same file name each get their own report
+    """
+    input_path = tmp_path / "ratings_data.csv"
+    partitioned_df = pd.concat([SAMPLE_RATINGS_DF.assign(country=country)
+                                for country in ["New Zealand", "New_Zealand", "A/B", "A B"]])
+    partitioned_df.to_csv(input_path, index=False)
+
+    report_paths = analyze_ratings_by_partition(
+        input_path, tmp_path / "reports", partition_column="country", max_workers=2)
+
+    assert len(set(report_paths.values())) == 4
+    assert len(list((tmp_path / "reports").glob("*.pdf"))) == 4
+    # a value that is already a portable name keeps it
+    assert report_paths["New_Zealand"].name == "ratings_analysis_country=New_Zealand.pdf"
+    assert report_paths["New Zealand"].name.startswith("ratings_analysis_country=New_Zealand-")
+    assert len(set(partition_file_names(["A/B", "A B"]))) == 2
+    assert partition_file_names(["India"]) == ["India"]
+
+
+def test_sketch_rating_statistics_match_exact_statistics(tmp_path):
+    """
+    test statistics from chunked rating sketches match the exact statistics for one-decimal ratings
+    """
+    input_path = tmp_path / "ratings_data.csv"
+    ratings_df = pd.DataFrame({
+        "rating_text": ["Poor", "Average", "Average", "Average", "Good", "Very Good", "Excellent", "Muy Bueno"],
+        "user_aggregate_rating": [2.4, 3.1, 3.3, 3.4, 3.7, 4.2, 4.9, 4.0]
+    })
+    ratings_df.to_csv(input_path, index=False)
+
+    exact = compute_rating_statistics(prepare_ratings(ratings_df))
+    approximate = sketch_rating_statistics(sketch_ratings(input_path, chunk_size=3))
+
+    pd.testing.assert_frame_equal(approximate["summary"], exact["summary"])
+    assert approximate["counts"].tolist() == exact["counts"].tolist()
+    np.testing.assert_array_equal(approximate["histogram"][0], exact["histogram"][0])
+    np.testing.assert_allclose(approximate["histogram"][1], exact["histogram"][1])
+    for sketched, expected in zip(approximate["violin_stats"], exact["violin_stats"]):
+        np.testing.assert_allclose(sketched["vals"], expected["vals"])
+
+
+def test_merged_shard_sketches_match_single_sketch(tmp_path):
+    """
+    test sketches built per shard and merged equal the sketch of all ratings, and the report renders
+    """
+    shard_paths = []
+    for i, shard_df in enumerate([SAMPLE_RATINGS_DF.iloc[:2], SAMPLE_RATINGS_DF.iloc[2:]]):
+        shard_paths.append(tmp_path / f"ratings_data_{i}.csv")
+        shard_df.to_csv(shard_paths[-1], index=False)
+    all_path = tmp_path / "ratings_data.csv"
+    SAMPLE_RATINGS_DF.to_csv(all_path, index=False)
+
+    merged = merge_rating_sketches([sketch_ratings(path) for path in shard_paths])
+    single = sketch_ratings(all_path)
+    for key, sketch in single.items():
+        np.testing.assert_array_equal(merged[key].bin_counts, sketch.bin_counts)
+
+    pdf_output_path = tmp_path / "ratings_analysis.pdf"
+    analyze_ratings_approximate(shard_paths, pdf_output_path, max_workers=2)
+    assert pdf_output_path.exists() and pdf_output_path.stat().st_size > 0
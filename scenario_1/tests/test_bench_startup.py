@@ -0,0 +1,10 @@
+from scenario_1.benchmarks.bench_startup import ENTRY_POINTS, run_entry_point
+
+
+def test_entry_points_start_without_heavy_dependencies():
+    """
+    test both scenario entry points reach their usage or menu without importing pandas and the other heavy modules
+    """
+    for name, cwd, args, stdin, budget in ENTRY_POINTS:
+        _, imported = run_entry_point(cwd, args, stdin)
+        assert imported == [], name
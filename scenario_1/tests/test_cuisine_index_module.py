@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scenario_1.cuisine_index_module import CuisineIndex, tokenize_cuisines, build_cuisine_index
+
+# sample preprocessed restaurant details, restaurant 10002 appears twice after a rating update
+SAMPLE_RESTAURANT_DF = pd.DataFrame({
+    "restaurant_id": pd.array([10001, 10002, 10002, 10003, 10004, 10005, None], dtype="Int64"),
+    "country": pd.array([1, 1, 1, 214, 1, None, 1], dtype="Int64"),
+    "cuisines": pd.Categorical(["Japanese, Sushi", "Sushi, Japanese, Asian", "Sushi, Japanese, Asian",
+                                "Japanese, Sushi", "North Indian, Chinese", "Japanese", "Sushi"]),
+    "user_aggregate_rating": [4.1, 4.3, 4.4, 3.9, 3.5, 4.0, 3.0]
+})
+
+
+def test_tokenize_cuisines():
+    """
+    test comma-joined cuisines are split into trimmed names and missing cuisines have none
+    """
+    assert tokenize_cuisines("North Indian, Chinese") == ["North Indian", "Chinese"]
+    assert tokenize_cuisines("NA") == []
+    assert tokenize_cuisines(np.nan) == []
+
+
+def test_cuisine_index_queries_match_substring_scan():
+    """
+    test cuisine and country queries return the same restaurants as scanning every row
+    """
+    index = CuisineIndex.from_dataframe(SAMPLE_RESTAURANT_DF)
+
+    assert index.restaurants_with_cuisine("sushi").tolist() == [10001, 10002, 10003]
+    assert index.query(["Japanese", "Sushi"], country_code=1).tolist() == [10001, 10002]
+    assert index.query(["Asian", "Chinese"], match="any").tolist() == [10002, 10004]
+    assert index.query(["Japanese", "Pizza"]).tolist() == []
+    assert index.cuisines()["Japanese"] == 4
+
+    with pytest.raises(ValueError):
+        index.query(["Japanese"], match="some")
+
+
+def test_cuisine_index_merges_names_differing_by_case():
+    """
+    test cuisines spelled with different case are both found and a single cuisine can be queried as a string
+    """
+    restaurant_df = pd.DataFrame({
+        "restaurant_id": pd.array([10001, 10002, 10003], dtype="Int64"),
+        "country": pd.array([1, 1, 1], dtype="Int64"),
+        "cuisines": pd.Categorical(["Bar Food", "Bar food, Japanese", "Japanese"])
+    })
+    index = CuisineIndex.from_dataframe(restaurant_df)
+
+    assert index.restaurants_with_cuisine("bar food").tolist() == [10001, 10002]
+    assert index.query("Bar Food").tolist() == [10001, 10002]
+    assert index.query("Japanese").tolist() == [10002, 10003]
+
+
+def test_cuisine_index_round_trip(tmp_path):
+    """
+    test the index is rebuilt identically after being saved and loaded
+    """
+    input_path = tmp_path / "preprocessed_restaurant_details.parquet"
+    SAMPLE_RESTAURANT_DF.to_parquet(input_path, index=False)
+    index_path = tmp_path / "cuisine_index.npz"
+
+    index = build_cuisine_index(input_path, index_path)
+    loaded = CuisineIndex.load(index_path)
+
+    assert loaded.cuisine_names.tolist() == index.cuisine_names.tolist()
+    assert loaded.query(["Sushi"], country_code=214).tolist() == [10003]
+    assert loaded.restaurants_in_country(1).tolist() == [10001, 10002, 10004]
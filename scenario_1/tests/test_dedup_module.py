@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+from scenario_1.dedup_module import StreamingDeduplicator
+
+# sample event rows with repeated restaurants and titles
+SAMPLE_EVENTS_DF = pd.DataFrame({
+    "event_id": [1, 2, 3, 4, 5, 6, 7, 8],
+    "restaurant_id": [101, 101, 102, 101, 103, 102, 104, 103],
+    "event_title": ["Jazz", "Jazz", "Quiz", "Brunch", "Jazz", "Quiz", "NA", "Jazz"]
+})
+
+
+def test_unique_mask_matches_drop_duplicates():
+    """
+    test streaming deduplication keeps the same first occurrences as drop_duplicates
+    """
+    with StreamingDeduplicator(key_columns=["restaurant_id", "event_title"]) as dedup:
+        # rows are streamed in batches, duplicates of rows in earlier batches are dropped too
+        mask = np.concatenate([dedup.unique_mask(SAMPLE_EVENTS_DF.iloc[:3]),
+                               dedup.unique_mask(SAMPLE_EVENTS_DF.iloc[3:])])
+
+    expected = SAMPLE_EVENTS_DF.drop_duplicates(subset=["restaurant_id", "event_title"])
+    pd.testing.assert_frame_equal(SAMPLE_EVENTS_DF[mask], expected)
+    assert len(dedup) == len(expected)
+
+
+def test_spilled_fingerprints_still_detect_duplicates(tmp_path):
+    """
+    test duplicates of rows whose fingerprints were spilled to disk are dropped and spill files are removed
+    """
+    rng = np.random.default_rng(0)
+    rows_df = pd.DataFrame(rng.integers(0, 40, size=(500, 2)), columns=["restaurant_id", "event_id"])
+
+    dedup = StreamingDeduplicator(max_memory_fingerprints=50, spill_dir=tmp_path)
+    kept_df = pd.concat([dedup.drop_duplicates(rows_df.iloc[start:start + 60])
+                         for start in range(0, len(rows_df), 60)])
+
+    assert len(list(tmp_path.glob("*.npy"))) > 0
+    pd.testing.assert_frame_equal(kept_df, rows_df.drop_duplicates())
+    dedup.close()
+    assert list(tmp_path.glob("*.npy")) == []
+
+
+def test_mixed_type_rows_match_drop_duplicates():
+    """
+    test object columns mixing numbers, strings and missing values dedup like drop_duplicates,
+    e.g. 1 and "1" are different rows while 1 and 1.0, or None and NaN, are the same
+    """
+    rows_df = pd.DataFrame({
+        "restaurant_id": pd.Series([1, "1", 1.0, 2, "2", None, np.nan, None, "NA", "NA"], dtype=object),
+        "user_rating_votes": pd.Series(["10", 10, 10, "NA", "NA", 5, 5, 5, 5.0, 5], dtype=object)
+    })
+
+    with StreamingDeduplicator() as dedup:
+        kept_df = pd.concat([dedup.drop_duplicates(rows_df.iloc[:4]), dedup.drop_duplicates(rows_df.iloc[4:])])
+
+    pd.testing.assert_frame_equal(kept_df, rows_df.drop_duplicates())
@@ -1,7 +1,9 @@
+import os
 import pytest
 import pandas as pd
 from pathlib import Path
-from scenario_1.extraction_module_1 import filter_restaurant_details
+from scenario_1 import extraction_module_1
+from scenario_1.extraction_module_1 import filter_restaurant_details, load_country_codes, map_country_codes
 
 TEST_DATA_DIR = Path(__file__).resolve().parent / "test_data"
 
@@ -60,3 +62,50 @@ def test_filter_restaurant_details(tmp_path, sample_restaurant_csv, sample_count
     assert "country" in df.columns
     # ensure country mapping applied
     assert df["country"].iloc[0] == "Singapore"
+
+
+def test_filter_restaurant_details_in_chunks(tmp_path, sample_country_excel):
+    """Test the chunked mode writes the same output as filtering the whole table at once,
+    also when only some chunks have missing numeric values"""
+    restaurant_path = tmp_path / "restaurant_details.csv"
+    missing_votes_df = SAMPLE_RESTAURANT_DF.assign(user_rating_votes=["NA", "50"], user_aggregate_rating="NA")
+    pd.concat([SAMPLE_RESTAURANT_DF, missing_votes_df, SAMPLE_RESTAURANT_DF],
+              ignore_index=True).to_csv(restaurant_path, index=False)
+    whole_output_path = tmp_path / "whole_restaurant_details.csv"
+    chunked_output_path = tmp_path / "chunked_restaurant_details.csv"
+
+    filter_restaurant_details(restaurant_path, sample_country_excel, whole_output_path)
+    filter_restaurant_details(restaurant_path, sample_country_excel, chunked_output_path, chunk_size=2)
+
+    assert chunked_output_path.read_bytes() == whole_output_path.read_bytes()
+    output_df = pd.read_csv(chunked_output_path, dtype=str, keep_default_na=False)
+    assert output_df["country"].tolist() == ["Singapore"] * 3
+    assert output_df["user_rating_votes"].tolist() == ["100", "NA", "100"]
+
+
+def test_load_country_codes_reuses_cache(tmp_path, sample_country_excel, monkeypatch):
+    """Test country codes are parsed once and then loaded from the cache, even after the workbook is touched"""
+    cache_dir = tmp_path / "cache"
+    first_mapping = load_country_codes(sample_country_excel, cache_dir=cache_dir)
+    assert first_mapping == {"SG": "Singapore", "US": "United States"}
+    assert len(list(cache_dir.glob("*.json"))) == 1
+
+    def fail_parse(_):
+        raise AssertionError("workbook should not be parsed again")
+
+    monkeypatch.setattr(extraction_module_1, "parse_country_code_workbook", fail_parse)
+    # touching the workbook changes its mtime but not its content hash
+    stat = sample_country_excel.stat()
+    os.utime(sample_country_excel, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    extraction_module_1._country_mapping_memo.clear()
+
+    assert load_country_codes(sample_country_excel, cache_dir=cache_dir) == first_mapping
+
+
+def test_map_country_codes_vectorized_lookup():
+    """Test integer country codes are mapped with missing values for unknown codes"""
+    codes = pd.Series([1, 216, 999, None, -3], dtype="Int64")
+    mapped = map_country_codes(codes, {1: "India", 216: "United States"})
+    assert isinstance(mapped.dtype, pd.CategoricalDtype)
+    assert mapped.tolist()[:2] == ["India", "United States"]
+    assert mapped.iloc[2:].isna().all()
@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from scenario_1.extraction_module_2 import EventIntervalIndex, filter_events_by_date, filter_events_by_date_windows, date_windows
+
+TEST_DATA_DIR = Path(__file__).resolve().parent / "test_data"
+
+# sample Event Data
+SAMPLE_EVENT_DF = pd.DataFrame({
+    "event_id": ["E1", "E2", "E3", "E4", "E5"],
+    "restaurant_id": ["12345", "12345", "67890", "67890", "67890"],
+    "restaurant_name": ["Test Restaurant", "Test Restaurant", "Another Place", "Another Place", "Another Place"],
+    "photo_url": ["NA", "NA", "NA", "NA", "NA"],
+    "event_title": ["March Event", "April Event", "Open Ended", "No Start", "Spanning Event"],
+    "event_start_date": ["2019-03-01", "2019-04-10", "2019-04-20", "NA", "2019-01-01"],
+    "event_end_date": ["2019-03-05", "2019-04-11", "NA", "2019-04-02", "2019-12-31"]
+})
+
+
+@pytest.fixture
+def sample_event_csv(tmp_path):
+    """
+    creates a temporary sample event CSV file for testing
+    """
+    file_path = tmp_path / "event_details.csv"
+    SAMPLE_EVENT_DF.to_csv(file_path, index=False)
+    return file_path
+
+
+def test_filter_events_by_date(tmp_path, sample_event_csv):
+    """Test events overlapping the window, or with one missing date on the right side of it, are kept"""
+    output_path = tmp_path / "restaurant_events.csv"
+    filter_events_by_date(sample_event_csv, output_path,
+                          "2019-04-01", "2019-04-30")
+
+    df = pd.read_csv(output_path, keep_default_na=False)
+    assert df["event_id"].tolist() == ["E2", "E3", "E4", "E5"]
+    assert df.loc[df["event_id"] == "E3", "event_end_date"].values[0] == "NA"
+
+
+def test_event_interval_index_matches_boolean_masks():
+    """Test interval index queries return the same rows as the full-scan date masks"""
+    rng = np.random.default_rng(0)
+    day_offsets = rng.integers(0, 365, size=(2000, 2))
+    starts = pd.Series(pd.Timestamp("2019-01-01") +
+                       pd.to_timedelta(day_offsets[:, 0], unit="D"))
+    ends = pd.Series(pd.Timestamp("2019-01-01") +
+                     pd.to_timedelta(day_offsets[:, 1], unit="D"))
+    # include missing dates and intervals ending before they start
+    starts[rng.random(2000) < 0.1] = pd.NaT
+    ends[rng.random(2000) < 0.1] = pd.NaT
+
+    event_index = EventIntervalIndex(starts, ends)
+    for _ in range(50):
+        window_start, window_end = sorted(pd.Timestamp(
+            "2019-01-01") + pd.to_timedelta(rng.integers(0, 365, size=2), unit="D"))
+        expected = np.flatnonzero(
+            ((ends >= window_start) & (starts <= window_end)) |
+            ((starts >= window_start) & ends.isna()) |
+            ((ends <= window_end) & starts.isna())
+        )
+        np.testing.assert_array_equal(
+            event_index.query(window_start, window_end), expected)
+
+
+def test_filter_events_by_date_windows(tmp_path, sample_event_csv):
+    """Test each window is written to its own partition with the same rows as a single-window call"""
+    windows = date_windows("2019-03-01", "2019-04-30", "M") + \
+        [("2019-04-30", "2019-04-01")]
+    output_paths = filter_events_by_date_windows(
+        sample_event_csv, tmp_path, windows)
+
+    # the window with start after end is rejected
+    assert len(output_paths) == 2
+    assert not (tmp_path / "window=2019-04-30_2019-04-01").exists()
+    april_path = tmp_path / "window=2019-04-01_2019-04-30" / "restaurant_events.csv"
+    assert output_paths[windows[1]] == april_path
+
+    filter_events_by_date(sample_event_csv, tmp_path /
+                          "april.csv", "2019-04-01", "2019-04-30")
+    assert april_path.read_text() == (tmp_path / "april.csv").read_text()
+
+    march_df = pd.read_csv(output_paths[windows[0]], keep_default_na=False)
+    assert march_df["event_id"].tolist() == ["E1", "E3", "E5"]
@@ -0,0 +1,67 @@
+import json
+import tracemalloc
+import pandas as pd
+from scenario_1.instrumentation_module import PipelineMetrics, table_row_count
+from scenario_1.pipeline_module import Task, run_tasks
+
+# sample table passed between instrumented steps
+SAMPLE_TABLE_DF = pd.DataFrame({
+    "restaurant_id": ["10001", "10002", "10003"],
+    "user_aggregate_rating": [3.2, 4.1, 4.8]
+})
+
+
+def test_table_row_count(tmp_path):
+    """
+    test row counts are read from csv and parquet tables, other files have none
+    """
+    csv_path = tmp_path / "table.csv"
+    parquet_path = tmp_path / "table.parquet"
+    SAMPLE_TABLE_DF.to_csv(csv_path, index=False)
+    SAMPLE_TABLE_DF.to_parquet(parquet_path, index=False)
+
+    assert table_row_count(csv_path, chunk_size=2) == 3
+    assert table_row_count(parquet_path) == 3
+    assert table_row_count(tmp_path / "missing.csv") is None
+
+
+def test_pipeline_metrics_written_per_run(tmp_path):
+    """
+    test every step's time, memory and rows are written to the run's metrics file and profiles are saved
+    """
+    input_path = tmp_path / "input.parquet"
+    output_path = tmp_path / "output.csv"
+    SAMPLE_TABLE_DF.to_parquet(input_path, index=False)
+    tasks = [
+        Task("filter", lambda: SAMPLE_TABLE_DF.iloc[:2].to_csv(output_path, index=False),
+             inputs=[input_path], outputs=[output_path]),
+        Task("report", lambda: None, deps=["filter"]),
+    ]
+
+    metrics = PipelineMetrics(tmp_path / "metrics", profile_steps=["filter"], trace_memory=True)
+    run_tasks(metrics.measure_tasks(tasks), max_workers=1)
+    metrics_path = metrics.write()
+    tracemalloc.stop()
+
+    steps = json.loads(metrics_path.read_text())["steps"]
+    assert steps["filter"]["rows_in"] == 3 and steps["filter"]["rows_out"] == 2
+    assert steps["report"]["rows_in"] is None
+    for step in steps.values():
+        assert step["status"] == "ran"
+        assert step["wall_time_s"] >= 0 and step["cpu_time_s"] >= 0
+        assert step["tracemalloc_peak_mb"] is not None
+    assert (tmp_path / "metrics" / f"run_{metrics.run_id}_filter.prof").exists()
+
+
+def test_pipeline_metrics_runs_started_together_write_separate_files(tmp_path):
+    """
+    test runs started within the same second do not overwrite each other's metrics file
+    """
+    metrics_paths = []
+    for _ in range(2):
+        metrics = PipelineMetrics(tmp_path / "metrics")
+        run_tasks(metrics.measure_tasks([Task("report", lambda: None)]), max_workers=1)
+        metrics_paths.append(metrics.write())
+
+    assert metrics_paths[0] != metrics_paths[1]
+    assert len(list((tmp_path / "metrics").glob("run_*.json"))) == 2
@@ -0,0 +1,85 @@
+import pandas as pd
+from scenario_1.intermediate_storage_module import apply_typed_schema, write_table, read_table, prepare_csv_export, \
+    concat_tables, parse_dates, parse_numbers
+
+# sample preprocessed event data with "NA" placeholders as written by the extractors
+SAMPLE_EVENT_DF = pd.DataFrame({
+    "event_id": [1, "NA"],
+    "restaurant_name": ["Test Restaurant", "Test Restaurant"],
+    "event_start_date": ["2019-04-01", "NA"],
+    "user_aggregate_rating": ["4.5", "NA"]
+})
+
+TYPED_SCHEMA = {
+    "event_id": "Int64",
+    "restaurant_name": "category",
+    "event_start_date": "datetime64[ns]",
+    "user_aggregate_rating": "float64"
+}
+
+
+def test_parquet_round_trip_keeps_types_and_projects_columns(tmp_path):
+    """Test typed parquet tables keep their dtypes and only load requested columns"""
+    output_path = tmp_path / "events.parquet"
+    write_table(apply_typed_schema(SAMPLE_EVENT_DF, TYPED_SCHEMA), output_path)
+
+    df = read_table(output_path, columns=["event_id", "event_start_date"])
+    assert list(df.columns) == ["event_id", "event_start_date"]
+    assert str(df["event_id"].dtype) == "Int64"
+    assert pd.api.types.is_datetime64_any_dtype(df["event_start_date"])
+    assert df["event_start_date"].isna().iloc[1]
+
+    full_df = read_table(output_path)
+    assert isinstance(full_df["restaurant_name"].dtype, pd.CategoricalDtype)
+    assert full_df["user_aggregate_rating"].iloc[0] == 4.5
+
+
+def test_prepare_csv_export_formats_dates_and_fills_missing():
+    """Test csv export writes dates without times and "NA" for missing values in typed columns"""
+    export_df = prepare_csv_export(
+        apply_typed_schema(SAMPLE_EVENT_DF, TYPED_SCHEMA))
+
+    assert export_df["event_start_date"].tolist() == ["2019-04-01", "NA"]
+    assert export_df["event_id"].tolist() == [1, "NA"]
+    assert export_df["restaurant_name"].iloc[0] == "Test Restaurant"
+
+
+def test_concat_tables_keeps_categoricals_with_different_categories():
+    """Test concatenated categorical columns stay categorical with the union of their categories"""
+    first_df = pd.DataFrame({"city": pd.Categorical(["Singapore", "NA"])})
+    second_df = pd.DataFrame({"city": pd.Categorical(["Jakarta"])})
+
+    df = concat_tables([first_df, second_df])
+    assert isinstance(df["city"].dtype, pd.CategoricalDtype)
+    assert df["city"].tolist() == ["Singapore", "NA", "Jakarta"]
+
+    typed_df = apply_typed_schema(df, {"city": "category"})
+    assert sorted(typed_df["city"].cat.categories) == ["Jakarta", "Singapore"]
+
+
+def test_parse_dates_counts_invalid_values():
+    """Test dates are parsed with the fixed format and present values that are not dates are counted"""
+    dates, invalid_count = parse_dates(pd.Series(["2019-04-01", None, "2019-13-01", "01/04/2019"]))
+    assert str(dates.dtype) == "datetime64[ns]"
+    assert dates.iloc[0] == pd.Timestamp("2019-04-01")
+    assert dates.isna().tolist() == [False, True, True, True]
+    assert invalid_count == 2
+
+    # already parsed dates are kept as they are
+    assert parse_dates(dates)[1] == 0
+
+    invalid_counts = {}
+    apply_typed_schema(SAMPLE_EVENT_DF, TYPED_SCHEMA, invalid_counts)
+    assert invalid_counts == {"event_id": 0, "event_start_date": 0, "user_aggregate_rating": 0}
+
+
+def test_parse_numbers_counts_invalid_values():
+    """Test values that are not numbers are set to missing and counted, missing values are not counted"""
+    numbers, invalid_count = parse_numbers(pd.Series(["18", None, "IN", 5]), "Int64")
+    assert str(numbers.dtype) == "Int64"
+    assert numbers.isna().tolist() == [False, True, True, False]
+    assert invalid_count == 1
+
+    invalid_counts = {}
+    apply_typed_schema(pd.DataFrame({"country": ["1", "NA", "IN"]}), {"country": "Int64"}, invalid_counts)
+    assert invalid_counts == {"country": 1}
@@ -0,0 +1,42 @@
+import json
+import pytest
+from scenario_1 import main
+from scenario_1.pipeline_module import Task
+
+
+def failing_step():
+    """
+    a step raising a ValueError of its own, like a malformed json file or date
+    """
+    raise json.JSONDecodeError("Expecting value", "", 0)
+
+
+@pytest.fixture
+def failing_pipeline(tmp_path, monkeypatch):
+    """
+    replaces the pipeline with a single failing step, saving metrics to tmp_path
+    """
+    monkeypatch.setattr(main, "build_tasks", lambda database_path=None: [Task("preprocess", failing_step)])
+    monkeypatch.setattr(main, "METRICS_DIR", tmp_path)
+
+
+def test_main_exits_non_zero_on_unknown_target(failing_pipeline, capsys):
+    """
+    test an unknown target is reported without running any step
+    """
+    with pytest.raises(SystemExit) as exc_info:
+        main.main(["no_such_step"])
+
+    assert exc_info.value.code != 0
+    assert "Unknown target(s): no_such_step" in capsys.readouterr().err
+
+
+def test_main_propagates_step_errors(failing_pipeline, tmp_path):
+    """
+    test a ValueError raised inside a step is not mistaken for a bad target and reaches the caller
+    """
+    with pytest.raises(json.JSONDecodeError):
+        main.main([])
+
+    # the failed step's metrics are still saved
+    assert list(tmp_path.glob("run_*.json"))
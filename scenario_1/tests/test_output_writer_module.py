@@ -0,0 +1,68 @@
+import pytest
+import pandas as pd
+from scenario_1.output_writer_module import write_csv, write_csv_chunks, write_parquet, atomic_output, \
+    infer_compression
+
+# sample restaurant details as exported by extraction module 1
+SAMPLE_RESTAURANT_DF = pd.DataFrame({
+    "restaurant_id": [10001, 10002, 10003, 10004, 10005],
+    "restaurant_name": ["Sushi Bar", "Curry, House", "Pasta Place", "Noodle Shop", "New Cafe"],
+    "user_aggregate_rating": [4.1, 4.3, 3.9, 4.1, "NA"]
+})
+
+
+def test_write_csv_in_chunks_matches_to_csv(tmp_path):
+    """
+    test chunked csv output is identical to DataFrame.to_csv and leaves no temporary files
+    """
+    output_path = tmp_path / "restaurant_details.csv"
+    expected_path = tmp_path / "expected.csv"
+    SAMPLE_RESTAURANT_DF.to_csv(expected_path, index=False)
+
+    assert write_csv(SAMPLE_RESTAURANT_DF, output_path, chunk_size=2) == 5
+    assert output_path.read_bytes() == expected_path.read_bytes()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["expected.csv", "restaurant_details.csv"]
+
+    write_csv(SAMPLE_RESTAURANT_DF.iloc[:0], output_path)
+    assert output_path.read_text() == "restaurant_id,restaurant_name,user_aggregate_rating\n"
+
+
+def test_write_csv_compressed(tmp_path):
+    """
+    test gzip output is inferred from the suffix and reads back with pandas
+    """
+    output_path = tmp_path / "restaurant_details.csv.gz"
+    assert infer_compression(output_path) == "gzip"
+
+    write_csv(SAMPLE_RESTAURANT_DF, output_path, chunk_size=2)
+    assert output_path.read_bytes()[:2] == b"\x1f\x8b"
+    df = pd.read_csv(output_path, keep_default_na=False)
+    assert df["restaurant_name"].tolist() == SAMPLE_RESTAURANT_DF["restaurant_name"].tolist()
+
+    with pytest.raises(ValueError):
+        write_csv(SAMPLE_RESTAURANT_DF, tmp_path / "restaurant_details.csv", compression="lz4")
+
+
+def test_failed_write_keeps_previous_output(tmp_path):
+    """
+    test an output is left untouched when writing a new version fails part way
+    """
+    output_path = tmp_path / "restaurant_details.csv"
+    write_csv(SAMPLE_RESTAURANT_DF, output_path)
+    previous = output_path.read_bytes()
+
+    def failing_chunks():
+        yield SAMPLE_RESTAURANT_DF.iloc[:2]
+        raise RuntimeError("stage crashed")
+
+    with pytest.raises(RuntimeError):
+        write_csv_chunks(failing_chunks(), output_path)
+
+    assert output_path.read_bytes() == previous
+    assert [path.name for path in tmp_path.iterdir()] == ["restaurant_details.csv"]
+
+    with pytest.raises(RuntimeError):
+        with atomic_output(tmp_path / "restaurant_details.parquet") as temp_path:
+            write_parquet(SAMPLE_RESTAURANT_DF.astype(str), temp_path)
+            raise RuntimeError("stage crashed")
+    assert [path.name for path in tmp_path.iterdir()] == ["restaurant_details.csv"]
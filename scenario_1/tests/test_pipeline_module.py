@@ -0,0 +1,90 @@
+import os
+import threading
+import pytest
+from scenario_1.pipeline_module import Task, is_up_to_date, resolve_tasks, run_tasks
+
+
+def write_after(source_path, output_path):
+    """
+    returns an action writing output_path with a newer mtime than source_path
+    """
+    def action():
+        output_path.write_text("output")
+        source_mtime = source_path.stat().st_mtime_ns
+        os.utime(output_path, ns=(source_mtime + 10**9, source_mtime + 10**9))
+    return action
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """
+    creates a raw input, a "preprocess" task and two tasks depending on its output
+    """
+    raw_path = tmp_path / "raw.json"
+    raw_path.write_text("raw")
+    preprocessed_path = tmp_path / "preprocessed.parquet"
+    output_paths = [tmp_path / "task_1.csv", tmp_path / "task_2.csv"]
+
+    tasks = [
+        Task("preprocess", write_after(raw_path, preprocessed_path),
+             inputs=[raw_path], outputs=[preprocessed_path]),
+        Task("task_1", write_after(preprocessed_path, output_paths[0]),
+             inputs=[preprocessed_path], outputs=[output_paths[0]], deps=["preprocess"]),
+        Task("task_2", write_after(preprocessed_path, output_paths[1]),
+             inputs=[preprocessed_path], outputs=[output_paths[1]], deps=["preprocess"]),
+    ]
+    return tasks, raw_path
+
+
+def test_run_tasks_skips_up_to_date_tasks(pipeline):
+    """
+    test tasks run once, are skipped while up to date and re-run when an input changes
+    """
+    tasks, raw_path = pipeline
+
+    assert set(run_tasks(tasks).values()) == {"ran"}
+    assert all(is_up_to_date(task) for task in tasks)
+    assert set(run_tasks(tasks).values()) == {"skipped"}
+    assert set(run_tasks(tasks, force=True).values()) == {"ran"}
+
+    # a newer raw input makes the whole chain stale
+    raw_mtime = tasks[0].outputs[0].stat().st_mtime_ns + 10**9
+    os.utime(raw_path, ns=(raw_mtime, raw_mtime))
+    assert set(run_tasks(tasks).values()) == {"ran"}
+
+
+def test_run_tasks_runs_target_with_dependencies(pipeline):
+    """
+    test running one target only runs it and the tasks it depends on
+    """
+    tasks, _ = pipeline
+
+    assert run_tasks(tasks, ["task_2"]) == {"preprocess": "ran", "task_2": "ran"}
+    assert not tasks[1].outputs[0].exists()
+
+
+def test_run_tasks_runs_independent_tasks_concurrently():
+    """
+    test tasks sharing only a dependency run at the same time
+    """
+    barrier = threading.Barrier(2, timeout=5)
+    tasks = [
+        Task("preprocess", lambda: None),
+        Task("task_1", barrier.wait, deps=["preprocess"]),
+        Task("task_2", barrier.wait, deps=["preprocess"]),
+    ]
+
+    # each task waits for the other at the barrier, so running them one after another would time out
+    assert set(run_tasks(tasks, max_workers=2).values()) == {"ran"}
+
+
+def test_resolve_tasks_rejects_unknown_targets_and_cycles():
+    """
+    test unknown targets and dependency cycles are reported
+    """
+    tasks = [Task("a", lambda: None, deps=["b"]), Task("b", lambda: None, deps=["a"])]
+
+    with pytest.raises(ValueError, match="Unknown target"):
+        resolve_tasks(tasks, ["c"])
+    with pytest.raises(ValueError, match="cycle"):
+        resolve_tasks(tasks)
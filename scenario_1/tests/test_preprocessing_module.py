@@ -2,7 +2,9 @@ import pytest
 import pandas as pd
 import json
 from pathlib import Path
-from scenario_1.preprocessing_module import json_to_restaurant_details_csv, json_to_event_details_csv
+from scenario_1.preprocessing_module import json_to_restaurant_details_csv, json_to_event_details_csv, json_to_restaurant_and_event_csv, iter_restaurant_pages, iter_restaurants, ColumnarBuilder, json_files_to_restaurant_and_event_csv, save_restaurant_details, RESTAURANT_COLUMNS
+from scenario_1.dedup_module import StreamingDeduplicator
+from scenario_1.intermediate_storage_module import read_table
 
 # test data directory
 TEST_DATA_DIR = Path(__file__).resolve().parent / "test_data"
@@ -59,3 +61,196 @@ def test_json_to_event_details_csv(tmp_path, sample_json_file):
     assert not df.empty
     assert "event_id" in df.columns
     assert df.loc[0, "event_title"] != "NA"
+
+
+def test_iter_restaurant_pages_matches_json_load(tmp_path):
+    """Test streaming parser yields the same pages as json.load, across small read chunks"""
+    file_path = tmp_path / "pages.json"
+    pages = SAMPLE_JSON + [{"results_found": 1.5, "restaurants": []}, {}]
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(pages, f, indent=2)
+
+    assert list(iter_restaurant_pages(file_path, chunk_size=7)) == pages
+    assert list(iter_restaurant_pages(file_path)) == pages
+
+    restaurants = list(iter_restaurants(file_path, chunk_size=7))
+    assert len(restaurants) == 1
+    assert restaurants[0]["name"] == "Test Restaurant"
+
+
+def test_json_to_restaurant_and_event_csv(tmp_path):
+    """Test single-pass extraction writes the same tables as the separate extractors"""
+    restaurant_path = tmp_path / "restaurant_details.csv"
+    event_path = tmp_path / "event_details.csv"
+    json_to_restaurant_and_event_csv(
+        iter(SAMPLE_JSON), restaurant_path, event_path)
+
+    json_to_restaurant_details_csv(SAMPLE_JSON, tmp_path / "restaurants_only.csv")
+    json_to_event_details_csv(SAMPLE_JSON, tmp_path / "events_only.csv")
+
+    pd.testing.assert_frame_equal(
+        pd.read_csv(restaurant_path), pd.read_csv(tmp_path / "restaurants_only.csv"))
+    pd.testing.assert_frame_equal(
+        pd.read_csv(event_path), pd.read_csv(tmp_path / "events_only.csv"))
+
+
+def test_columnar_builder_batches_rows_into_typed_columns():
+    """Test columnar builder keeps row order and declared dtypes across batch boundaries"""
+    builder = ColumnarBuilder({"restaurant_id": "object", "restaurant_name": "str"}, batch_size=2)
+    for row in [(1, "A"), ("NA", "B"), (3, "C")]:
+        builder.append(row)
+
+    df = builder.to_dataframe()
+    assert len(builder) == 3
+    assert df["restaurant_id"].tolist() == [1, "NA", 3]
+    assert df["restaurant_name"].tolist() == ["A", "B", "C"]
+    assert df["restaurant_id"].dtype == object
+
+    empty_df = ColumnarBuilder({"event_id": "object"}).to_dataframe()
+    assert empty_df.empty
+    assert list(empty_df.columns) == ["event_id"]
+
+
+def test_columnar_builder_builds_categorical_columns_across_batches():
+    """Test categorical columns built from batches with different categories keep all values"""
+    builder = ColumnarBuilder({"city": "category"}, batch_size=2)
+    for row in [("Singapore",), ("Jakarta",), ("Manila",)]:
+        builder.append(row)
+
+    df = builder.to_dataframe()
+    assert isinstance(df["city"].dtype, pd.CategoricalDtype)
+    assert df["city"].tolist() == ["Singapore", "Jakarta", "Manila"]
+
+
+def test_columnar_builder_drops_duplicates_across_batches():
+    """Test columnar builder with a deduplicator keeps the first occurrence of rows repeated across batches"""
+    builder = ColumnarBuilder({"restaurant_id": "object", "event_title": "str"}, batch_size=2,
+                              deduplicator=StreamingDeduplicator(key_columns=["event_title"]))
+    for row in [(1, "Jazz"), (2, "Quiz"), (3, "Jazz"), (4, "Brunch"), (5, "Quiz")]:
+        builder.append(row)
+
+    df = builder.to_dataframe()
+    assert len(builder) == 3
+    assert df["restaurant_id"].tolist() == [1, 2, 4]
+
+
+def test_json_files_to_restaurant_and_event_csv_dedups_across_shards(tmp_path):
+    """Test sharded ingestion in a process pool matches single-file extraction of the concatenated shards"""
+    duplicate_page = {"restaurants": [{"restaurant": {
+        "R": {"res_id": "12345"},
+        "name": "Test Restaurant",
+        "location": {"city": "Singapore", "country_id": "SG"},
+        "user_rating": {"votes": "100", "aggregate_rating": "4.5", "rating_text": "Excellent"},
+        "cuisines": "Asian, Japanese",
+        "zomato_events": [{"event": {"event_id": "E2", "start_date": "2025-03-10"}}]
+    }}]}
+    other_page = {"restaurants": [{"restaurant": {
+        "R": {"res_id": "67890"}, "name": "Another Place"}}]}
+    shards = [SAMPLE_JSON, [duplicate_page, other_page]]
+
+    shard_paths = []
+    for i, shard in enumerate(shards):
+        shard_path = tmp_path / f"restaurants_{i}.json"
+        with open(shard_path, "w", encoding="utf-8") as f:
+            json.dump(shard, f)
+        shard_paths.append(shard_path)
+
+    json_files_to_restaurant_and_event_csv(
+        reversed(shard_paths), tmp_path / "restaurants.csv", tmp_path / "events.csv", max_workers=2)
+    json_to_restaurant_and_event_csv(
+        shards[0] + shards[1], tmp_path / "expected_restaurants.csv", tmp_path / "expected_events.csv")
+
+    restaurant_df = pd.read_csv(tmp_path / "restaurants.csv")
+    event_df = pd.read_csv(tmp_path / "events.csv")
+    pd.testing.assert_frame_equal(
+        restaurant_df, pd.read_csv(tmp_path / "expected_restaurants.csv"))
+    pd.testing.assert_frame_equal(
+        event_df, pd.read_csv(tmp_path / "expected_events.csv"))
+    assert len(restaurant_df) == 2
+    # duplicate event keeps the first shard's event id
+    assert event_df["event_id"].tolist() == ["E1"]
+
+
+def test_json_files_to_restaurant_and_event_csv_reuses_checkpoints(tmp_path, sample_json_file, capsys):
+    """Test checkpointed ingestion only re-extracts changed files and keeps dedup rules across runs"""
+    checkpoint_dir = tmp_path / "checkpoints"
+    other_file = tmp_path / "other_restaurants.json"
+    with open(other_file, "w", encoding="utf-8") as f:
+        json.dump(SAMPLE_JSON, f)
+
+    paths = [sample_json_file, other_file]
+    restaurant_path = tmp_path / "restaurants.csv"
+    event_path = tmp_path / "events.csv"
+
+    json_files_to_restaurant_and_event_csv(
+        paths, restaurant_path, event_path, checkpoint_dir=checkpoint_dir)
+    assert "Extracted 2 raw json file(s), reused 0" in capsys.readouterr().out
+    # identical restaurant in both files is only kept once
+    assert len(pd.read_csv(restaurant_path)) == 1
+
+    changed_json = json.loads(json.dumps(SAMPLE_JSON))
+    changed_json[0]["restaurants"][0]["restaurant"]["name"] = "Renamed Restaurant"
+    with open(other_file, "w", encoding="utf-8") as f:
+        json.dump(changed_json, f)
+
+    json_files_to_restaurant_and_event_csv(
+        paths, restaurant_path, event_path, checkpoint_dir=checkpoint_dir)
+    assert "Extracted 1 raw json file(s), reused 1" in capsys.readouterr().out
+
+    restaurant_df = pd.read_csv(restaurant_path)
+    assert sorted(restaurant_df["restaurant_name"]) == [
+        "Renamed Restaurant", "Test Restaurant"]
+    # only the rows of the current file contents are kept in the checkpoint directory
+    assert len(list(checkpoint_dir.glob("*.pkl"))) == 4
+
+
+def test_json_files_to_restaurant_and_event_csv_without_raw_files(tmp_path):
+    """Test empty tables with every column are written when there are no raw json files"""
+    restaurant_path = tmp_path / "restaurants.parquet"
+    event_path = tmp_path / "events.parquet"
+    json_files_to_restaurant_and_event_csv([], restaurant_path, event_path)
+
+    restaurant_df = pd.read_parquet(restaurant_path)
+    event_df = pd.read_parquet(event_path)
+    assert len(restaurant_df) == 0 and "restaurant_id" in restaurant_df.columns
+    assert len(event_df) == 0 and "event_start_date" in event_df.columns
+
+
+def test_json_files_to_restaurant_and_event_csv_prunes_removed_files(tmp_path, sample_json_file):
+    """Test checkpoints of raw json files that were removed are dropped from the manifest and deleted"""
+    checkpoint_dir = tmp_path / "checkpoints"
+    other_file = tmp_path / "other_restaurants.json"
+    with open(other_file, "w", encoding="utf-8") as f:
+        json.dump([{"restaurants": [{"restaurant": {"R": {"res_id": "67890"}, "name": "Another Place"}}]}], f)
+
+    restaurant_path = tmp_path / "restaurants.csv"
+    event_path = tmp_path / "events.csv"
+    json_files_to_restaurant_and_event_csv(
+        [sample_json_file, other_file], restaurant_path, event_path, checkpoint_dir=checkpoint_dir)
+    assert len(list(checkpoint_dir.glob("*.pkl"))) == 4
+
+    other_file.unlink()
+    json_files_to_restaurant_and_event_csv(
+        [sample_json_file], restaurant_path, event_path, checkpoint_dir=checkpoint_dir)
+
+    with open(checkpoint_dir / "checkpoint_manifest.json", "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert list(manifest["files"]) == [str(sample_json_file)]
+    assert len(list(checkpoint_dir.glob("*.pkl"))) == 2
+
+
+def test_save_restaurant_details_reports_non_numeric_ids(tmp_path, capsys):
+    """Test restaurant ids and country codes that are not numbers are reported when stored as typed parquet"""
+    restaurant_df = pd.DataFrame([
+        ["12345", "Test Restaurant", "1", "Singapore", "100", "4.5", "Asian", "NA", "Excellent"],
+        ["R-1", "Another Place", "SG", "Singapore", "NA", "NA", "Cafe", "NA", "Good"],
+    ], columns=RESTAURANT_COLUMNS)
+    output_path = tmp_path / "restaurant_details.parquet"
+
+    save_restaurant_details(restaurant_df, output_path)
+
+    output = capsys.readouterr().out
+    assert "Warning: 1 invalid restaurant_id value(s) stored as missing" in output
+    assert "Warning: 1 invalid country value(s) stored as missing" in output
+    assert "user_rating_votes value(s)" not in output
+    assert read_table(output_path)["restaurant_id"].isna().tolist() == [False, True]
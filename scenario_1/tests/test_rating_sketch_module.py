@@ -0,0 +1,36 @@
+import pytest
+import numpy as np
+import pandas as pd
+from scenario_1.rating_sketch_module import RatingSketch
+
+# sample one-decimal aggregate ratings
+SAMPLE_RATINGS = np.array([2.4, 3.1, 3.3, 3.3, 3.9, 4.2, 4.4, 4.9, 4.9])
+
+
+def test_rating_sketch_describe_matches_pandas():
+    """
+    test the sketch summary matches Series.describe() for ratings on its bin grid
+    """
+    sketch = RatingSketch().update(SAMPLE_RATINGS[:4]).update(SAMPLE_RATINGS[4:])
+
+    expected = pd.Series(SAMPLE_RATINGS).describe().tolist()
+    np.testing.assert_allclose(sketch.describe(), expected)
+    np.testing.assert_allclose(sketch.quantiles([0.1, 0.9]), np.quantile(SAMPLE_RATINGS, [0.1, 0.9]))
+
+
+def test_rating_sketch_merge_rejects_different_bins():
+    """
+    test sketches with different bins cannot be merged
+    """
+    with pytest.raises(ValueError):
+        RatingSketch().merge(RatingSketch(bin_width=0.1))
+
+
+def test_empty_rating_sketch_describe():
+    """
+    test an empty sketch reports a zero count and missing statistics
+    """
+    summary = RatingSketch().update([np.nan]).describe()
+
+    assert summary[0] == 0
+    assert all(np.isnan(summary[1:]))
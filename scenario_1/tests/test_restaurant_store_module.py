@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from scenario_1.restaurant_store_module import RestaurantStore
+
+# sample restaurant details, restaurant 10002 appears twice after a rating update
+SAMPLE_RESTAURANT_DF = pd.DataFrame({
+    "restaurant_id": [10001, 10002, 10002, 10003, 10004, 10005],
+    "restaurant_name": ["Sushi Bar", "Curry House", "Curry House", "Pasta Place", "Noodle Shop", "New Cafe"],
+    "country": ["India", "India", "India", "United States", "India", "India"],
+    "city": ["Gurgaon", "Noida", "Noida", "Austin", "Gurgaon", "Gurgaon"],
+    "user_rating_votes": [120, 80, 90, 45, 300, 0],
+    "user_aggregate_rating": [4.1, 4.3, 4.4, 3.9, 4.1, None],
+    "cuisines": ["Japanese", "North Indian", "North Indian", "Italian", "Chinese", "Cafe"],
+    "event_date": ["2019-04-10", None, None, "2019-04-12", None, None]
+})
+
+
+def test_restaurant_store_lookup(tmp_path):
+    """
+    test restaurants are looked up by id and by country and city from the extraction output
+    """
+    restaurant_details_path = tmp_path / "restaurant_details.csv"
+    SAMPLE_RESTAURANT_DF.to_csv(restaurant_details_path, index=False, na_rep="NA")
+    store = RestaurantStore.load(restaurant_details_path)
+
+    assert len(store) == 6
+    assert store.lookup(10001)[0]["restaurant_name"] == "Sushi Bar"
+    assert [row["user_aggregate_rating"] for row in store.lookup(10002)] == [4.3, 4.4]
+    assert store.lookup(99999) == []
+    assert [row["restaurant_id"] for row in store.in_city("India", "Gurgaon")] == [10001, 10004, 10005]
+    assert store.in_city("India", "Austin") == []
+
+
+def test_restaurant_store_rating_queries():
+    """
+    test rating range and top-k queries match sorting the table, unrated restaurants are left out
+    """
+    store = RestaurantStore(SAMPLE_RESTAURANT_DF)
+
+    assert [row["restaurant_id"] for row in store.rating_range(4.0, 4.3)] == [10001, 10004, 10002]
+    assert store.rating_range(4.5, 5.0) == []
+    assert [row["user_aggregate_rating"] for row in store.top_k(2)] == [4.4, 4.3]
+    assert [row["restaurant_id"] for row in store.top_k(5, "India", "Gurgaon")] == [10001, 10004]
+    assert store.top_k(3, "India", "Mumbai") == []
+
+
+def test_restaurant_store_top_k_orders_ties_by_table_order():
+    """
+    test restaurants with the same rating come back in table order, overall and within a city
+    """
+    store = RestaurantStore(SAMPLE_RESTAURANT_DF)
+
+    # 10001 and 10004 are both rated 4.1 and 10001 comes first in the table
+    assert [row["restaurant_id"] for row in store.top_k(4)] == [10002, 10002, 10001, 10004]
+    assert [row["restaurant_id"] for row in store.top_k(2, "India", "Gurgaon")] == [10001, 10004]
+
+    with pytest.raises(ValueError):
+        store.top_k(2, country="India")
@@ -0,0 +1,73 @@
+import sqlite3
+import pytest
+import pandas as pd
+from scenario_1.sql_store_module import TableLoader, load_table, events_per_restaurant
+
+# sample restaurant details, restaurant 10002 appears twice after a rating update
+SAMPLE_RESTAURANT_DF = pd.DataFrame({
+    "restaurant_id": pd.array([10001, 10002, 10002, 10003], dtype="Int64"),
+    "restaurant_name": ["Sushi Bar", "Curry House", "Curry House", "Pasta Place"],
+    "country": pd.Categorical(["India", "India", "India", "United States"]),
+    "user_aggregate_rating": [4.1, 4.3, 4.4, None]
+})
+
+# sample preprocessed events with parsed dates
+SAMPLE_EVENT_DF = pd.DataFrame({
+    "event_id": pd.array([1, 2, 3, 4], dtype="Int64"),
+    "restaurant_id": pd.array([10001, 10002, 10002, 10003], dtype="Int64"),
+    "event_start_date": pd.to_datetime(["2019-03-01", "2019-04-10", "2019-04-20", None]),
+    "event_end_date": pd.to_datetime(["2019-03-05", "2019-04-11", "2019-05-01", "2019-04-02"])
+})
+
+
+def test_load_table_types_and_indexes(tmp_path):
+    """
+    test tables are loaded with sql types, missing values as NULL, ISO dates and their indexes
+    """
+    database_path = tmp_path / "scenario_1.sqlite"
+    load_table(database_path, "events", SAMPLE_EVENT_DF)
+
+    connection = sqlite3.connect(database_path)
+    rows = connection.execute("SELECT * FROM events ORDER BY event_id").fetchall()
+    indexes = {name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    connection.close()
+
+    assert rows[0] == (1, 10001, "2019-03-01", "2019-03-05")
+    assert rows[3] == (4, 10003, None, "2019-04-02")
+    assert indexes == {"idx_events_restaurant_id", "idx_events_event_start_date", "idx_events_event_end_date"}
+
+
+def test_events_per_restaurant_joins_countries(tmp_path):
+    """
+    test events are counted per restaurant and country, with and without a date window
+    """
+    database_path = tmp_path / "scenario_1.sqlite"
+    load_table(database_path, "restaurant_details", SAMPLE_RESTAURANT_DF)
+    load_table(database_path, "events", SAMPLE_EVENT_DF)
+
+    result = events_per_restaurant(database_path)
+    assert result[["country", "restaurant_id", "events"]].values.tolist() == [
+        ["India", 10002, 2], ["India", 10001, 1], ["United States", 10003, 1]]
+
+    april = events_per_restaurant(database_path, "2019-04-01", "2019-04-30")
+    assert april[["restaurant_id", "events"]].values.tolist() == [[10002, 2]]
+
+
+def test_failed_load_keeps_previous_table(tmp_path):
+    """
+    test a load that fails part way leaves the previously loaded table in place
+    """
+    database_path = tmp_path / "scenario_1.sqlite"
+    load_table(database_path, "restaurant_details", SAMPLE_RESTAURANT_DF)
+
+    with pytest.raises(RuntimeError):
+        with TableLoader(database_path, "restaurant_details", batch_size=2) as loader:
+            loader.append(SAMPLE_RESTAURANT_DF.iloc[:2])
+            raise RuntimeError("step crashed")
+
+    connection = sqlite3.connect(database_path)
+    tables = [name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    row_count = connection.execute("SELECT COUNT(*) FROM restaurant_details").fetchone()[0]
+    connection.close()
+    assert tables == ["restaurant_details"]
+    assert row_count == 4
@@ -0,0 +1,62 @@
+import json
+from scenario_1.benchmarks.synthetic_data import (
+    generate_restaurant_pages, write_restaurants_json, write_restaurants_json_shards)
+from scenario_1.benchmarks.bench_pipeline import compare_results
+from scenario_1.preprocessing_module import extract_restaurant_and_event_tables
+
+
+def test_synthetic_restaurants_follow_raw_schema(tmp_path):
+    """
+    test generated restaurants json is read by the preprocessing extractors like the raw data
+    """
+    json_path = write_restaurants_json(tmp_path / "restaurants.json", 500, seed=1)
+
+    raw_data = json.loads(json_path.read_text(encoding="utf-8"))
+    restaurant = raw_data[0]["restaurants"][0]["restaurant"]
+    assert {"R", "location", "user_rating", "zomato_events"} <= set(restaurant)
+    assert sum(page["results_shown"] for page in raw_data) == 500
+
+    restaurant_df, event_df = extract_restaurant_and_event_tables(json_path)
+    # duplicated restaurants are dropped
+    assert 0 < len(restaurant_df) < 500
+    assert len(event_df) > 0
+    assert (event_df["event_start_date"] <= event_df["event_end_date"]).all()
+
+
+def test_synthetic_restaurants_are_reproducible(tmp_path):
+    """
+    test the same seed generates the same restaurants and shards have distinct restaurant ids,
+    the only repeated ids are injected duplicates of the previous restaurant
+    """
+    assert list(generate_restaurant_pages(50, seed=3)) == list(generate_restaurant_pages(50, seed=3))
+
+    shard_paths = write_restaurants_json_shards(tmp_path / "first", 45, shard_count=2)
+    rerun_paths = write_restaurants_json_shards(tmp_path / "second", 45, shard_count=2)
+    assert [path.read_bytes() for path in shard_paths] == [path.read_bytes() for path in rerun_paths]
+    assert len(shard_paths) == 2
+
+    shard_ids = []
+    row_counts = []
+    for path in shard_paths:
+        restaurants = [entry["restaurant"] for page in json.loads(path.read_text(encoding="utf-8"))
+                       for entry in page["restaurants"]]
+        for previous, restaurant in zip(restaurants, restaurants[1:]):
+            assert restaurant["R"]["res_id"] > previous["R"]["res_id"] or restaurant == previous
+        shard_ids.append({restaurant["R"]["res_id"] for restaurant in restaurants})
+        row_counts.append(len(restaurants))
+
+    assert row_counts == [23, 22]
+    assert not shard_ids[0] & shard_ids[1]
+    assert shard_ids[0] | shard_ids[1] <= set(range(1, 46))
+
+
+def test_compare_results_flags_slower_stages():
+    """
+    test only stages slower than the threshold and long enough to compare are regressions
+    """
+    baseline = [{"size": 1000, "stage": "preprocess", "wall_time_s": 1.0},
+                {"size": 1000, "stage": "restaurant_events", "wall_time_s": 0.01}]
+    rows = [{"size": 1000, "stage": "preprocess", "wall_time_s": 1.5},
+            {"size": 1000, "stage": "restaurant_events", "wall_time_s": 0.05}]
+
+    assert compare_results(rows, baseline) == [(1000, "preprocess", 1.0, 1.5, 1.5)]
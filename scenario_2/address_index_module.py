@@ -0,0 +1,31 @@
+from rapidfuzz import fuzz, process, utils
+
+# this module holds the carpark addresses for address search, processed once (lowercased, punctuation removed)
+# when the static data is loaded instead of on every query
+# every address is scored with rapidfuzz's WRatio, so the matches are exactly those of a full scan
+
+
+class AddressIndex:
+    """
+    the carpark addresses and their processed forms (rapidfuzz's default_process)
+    """
+
+    def __init__(self, addresses):
+        self.addresses = list(addresses)
+        self._processed = [utils.default_process(address) for address in self.addresses]
+
+    @classmethod
+    def from_addresses(cls, addresses):
+        """
+        builds the index over a list of addresses
+        """
+        return cls(addresses)
+
+    def extract(self, query, limit=5):
+        """
+        returns the limit best (address, score) matches of the query, the same matches and order as
+        process.extract(query, addresses, scorer=fuzz.WRatio, processor=utils.default_process)
+        """
+        matches = process.extract(utils.default_process(query), self._processed, scorer=fuzz.WRatio,
+                                  processor=None, limit=limit)
+        return [(self.addresses[position], score) for _, score, position in matches]
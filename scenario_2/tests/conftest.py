@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# scenario_2 modules import each other by module name, as when run from the scenario_2 directory,
+# so make them importable when the tests are run from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
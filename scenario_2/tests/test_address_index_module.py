@@ -0,0 +1,57 @@
+import random
+from rapidfuzz import fuzz, process, utils
+from scenario_2.address_index_module import AddressIndex
+
+# sample carpark addresses
+SAMPLE_ADDRESSES = [
+    "BLK 270/271 ALBERT CENTRE BASEMENT CAR PARK",
+    "BLK 98A ALJUNIED CRESCENT",
+    "BLK 101 JALAN DUSUN",
+    "BLK 792A CHOA CHU KANG NORTH 6",
+    "BLK 401 CHOA CHU KANG AVENUE 1",
+]
+
+QUERIES = ["792a choa chu kang north", "choa chu kang", "albert centre", "blk 101", "kang choa", "b", "#", ""]
+
+
+def random_addresses(count, seed=0):
+    """
+    returns random addresses made of a few carpark address words and block numbers
+    """
+    rng = random.Random(seed)
+    words = ["BLK", "AVE", "ST", "ROAD", "CHOA", "CHU", "KANG", "JALAN", "BUKIT", "NORTH", "CENTRE", "CAR", "PARK"]
+    return [" ".join(rng.choice(words + [str(rng.randint(1, 999))]) for _ in range(rng.randint(1, 6)))
+            for _ in range(count)]
+
+
+def full_scan(query, addresses, limit=5):
+    """
+    returns the (address, score) matches of scoring every address with WRatio
+    """
+    matches = process.extract(query, addresses, scorer=fuzz.WRatio, processor=utils.default_process, limit=limit)
+    return [(address, score) for address, score, _ in matches]
+
+
+def test_extract_matches_full_scan():
+    """
+    test extract returns the same matches in the same order as scoring every address
+    """
+    addresses = random_addresses(300) + SAMPLE_ADDRESSES
+    address_index = AddressIndex.from_addresses(addresses)
+
+    for query in QUERIES + random_addresses(20, seed=1):
+        assert address_index.extract(query, limit=5) == full_scan(query, addresses)
+
+
+def test_extract_keeps_earlier_addresses_on_tied_scores():
+    """
+    test addresses tying the last match are ranked by position, so the earliest ones are kept
+    """
+    # trailing punctuation is stripped when processing, so every "BLK 1 ST 9" address scores the same
+    addresses = ["BLK 2 ST 9"] + [f"BLK 1 ST 9{suffix}" for suffix in ["", ",", ".", "/", "-", "#", "!"]]
+    address_index = AddressIndex.from_addresses(addresses)
+
+    matches = address_index.extract("blk 1 st 9", limit=5)
+    assert matches == full_scan("blk 1 st 9", addresses)
+    assert [address for address, _ in matches] == addresses[1:6]
+    assert len({score for _, score in matches}) == 1
@@ -0,0 +1,16 @@
+from scenario_2 import user_input_handling_module
+from scenario_2.user_input_handling_module import handle_user_input
+
+
+def test_handle_user_input_loads_static_data_on_first_search(monkeypatch, capsys):
+    """
+    test static carpark data is not loaded when the user exits from the menu
+    """
+    def fail_load():
+        raise AssertionError("static data should not be loaded before a search")
+
+    monkeypatch.setattr(user_input_handling_module, "load_static_data", fail_load)
+    monkeypatch.setattr("builtins.input", lambda prompt: "3")
+    handle_user_input()
+
+    assert "Exiting app." in capsys.readouterr().out
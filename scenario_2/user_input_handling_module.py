@@ -1,9 +1,8 @@
-import pandas as pd
 from pathlib import Path
-from fuzzywuzzy import process
 from cli_module import display_results, display_menu
-import carpark_api_fetcher_module
-import merged_data_processing_module
+
+# pandas, rapidfuzz, the address index and the api fetching modules are imported on first use rather than here,
+# so the menu is shown as soon as the app starts
 
 # Set base directories
 BASE_DIR = Path(__file__).resolve().parent
@@ -19,6 +18,8 @@ def load_static_data():
     """
     load static carpark data
     """
+    import pandas as pd
+
     if STATIC_CARPARK_DATA_PATH.exists():
         return pd.read_csv(STATIC_CARPARK_DATA_PATH, dtype=str)
     else:
@@ -40,17 +41,28 @@ def validate_carpark_number(carpark_number, static_data):
         return None
 
 
-def fuzzy_match_address(query, static_data):
+def load_address_search_index(static_data):
+    """
+    builds the address index of the static carpark data
+    """
+    from address_index_module import AddressIndex
+
+    return AddressIndex.from_addresses(static_data["address"].dropna().tolist())
+
+
+def fuzzy_match_address(query, static_data, address_index=None):
     """
     fuzzy match input address with static carpark data
+    every address is scored with rapidfuzz's WRatio, using address_index (built from static_data if not given)
     """
-    choices = static_data["address"].dropna().tolist()
-    matches = process.extract(query, choices, limit=5)
+    if address_index is None:
+        address_index = load_address_search_index(static_data)
+    matches = address_index.extract(query, limit=5)
 
     # show top 5 results
     print("\nNo exact match found. Did you mean:\n")
     for i, (match, score) in enumerate(matches, start=1):
-        print(f"{i}. {match} (Confidence: {score}%)")
+        print(f"{i}. {match} (Confidence: {round(score)}%)")
 
     print("6. Search Again")
     print("7. Return to Menu")
@@ -76,16 +88,29 @@ def fuzzy_match_address(query, static_data):
 def handle_user_input():
     """
     handles user input validation and triggers appropriate modules and functions
+    static carpark data is loaded on the first search, so the menu does not wait for it
     """
-    static_data = load_static_data()
-    if static_data.empty:
+    if not STATIC_CARPARK_DATA_PATH.exists():
+        print(f"Error: {STATIC_CARPARK_DATA_PATH} not found.")
         print("Error: No static carpark data available.")
         return
+    static_data = None
+    address_index = None
 
     while True:
         display_menu()
         choice = input("\nEnter your choice (1-3): ").strip()
 
+        if choice in ["1", "2"] and static_data is None:
+            static_data = load_static_data()
+            if static_data.empty:
+                print("Error: No static carpark data available.")
+                return
+
+        if choice == "2" and address_index is None:
+            # only address search needs the index
+            address_index = load_address_search_index(static_data)
+
         if choice == "1":
             # return to Carpark Number search if no match
             while True:
@@ -110,7 +135,7 @@ def handle_user_input():
             # return Address search if no match
             while True:
                 address_query = input("\nEnter Address: ").strip()
-                valid_carpark = fuzzy_match_address(address_query, static_data)
+                valid_carpark = fuzzy_match_address(address_query, static_data, address_index)
 
                 if valid_carpark == "search_again":
                     continue
@@ -129,6 +154,9 @@ def handle_user_input():
 
         if valid_carpark and valid_carpark not in ["search_again", "return_to_menu"]:
             print(f"\nFetching live data for carpark: {valid_carpark}...\n")
+            import pandas as pd
+            import carpark_api_fetcher_module
+            import merged_data_processing_module
 
             # fetch latest API data
             carpark_api_fetcher_module.main()